@@ -0,0 +1,89 @@
+"""
+Per-session state of the Streamlit app.
+
+Everything chat.py keeps between reruns lives on one `AppState` object
+stored under a single session-state key, instead of a dozen separately
+initialized keys. `__slots__` keeps each session's state compact and turns
+a misspelt attribute into an AttributeError instead of a silent new key.
+"""
+from history import ChatHistory
+from instrumentation import SessionProfiler
+
+# Records kept in memory per session before older ones spill to disk
+HISTORY_MEMORY_CAP = 200
+
+SESSION_KEY = "app"
+
+class AppState:
+    """
+    Settings and results of one browser session.
+
+    history             ChatHistory of compact message records
+    materials_generated int, materials created this session
+    current_grade       str, e.g. "Grade 4"
+    current_subject     str, a subject offered in current_grade
+    material_type       str, a key of lesson_generator.MATERIAL_TYPES
+    user_role           str, "teacher" or "student"
+    stream_output       bool, stream sections as they are generated
+    stream_delay_ms     int, pause between streamed sections
+    first_section_ms    float or None, time to first section of the last streamed response
+    response_total_ms   float or None, render and emit time of the last response when not streamed
+    batch_result        batch.BatchResult or None
+    differentiated_set  differentiate.DifferentiatedSet or None
+    export_formats      list of export.EXPORT_FORMATS keys
+    pending_prompt      str or None, a prompt queued by a sidebar button
+    profiler            instrumentation.SessionProfiler, switched on from the admin page
+    """
+    __slots__ = (
+        "history",
+        "materials_generated",
+        "current_grade",
+        "current_subject",
+        "material_type",
+        "user_role",
+        "stream_output",
+        "stream_delay_ms",
+        "first_section_ms",
+        "response_total_ms",
+        "batch_result",
+        "differentiated_set",
+        "export_formats",
+        "pending_prompt",
+        "profiler"
+    )
+
+    def __init__(self, history_cap=HISTORY_MEMORY_CAP):
+        self.history = ChatHistory(max_in_memory=history_cap)
+        self.materials_generated = 0
+        self.current_grade = "Grade 4"
+        self.current_subject = "Mathematics"
+        self.material_type = "worksheet"
+        self.user_role = "teacher"
+        self.stream_output = True
+        self.stream_delay_ms = 0
+        self.first_section_ms = None
+        self.response_total_ms = None
+        self.batch_result = None
+        self.differentiated_set = None
+        self.export_formats = ["md", "print"]
+        self.pending_prompt = None
+        self.profiler = SessionProfiler()
+
+    def take_pending_prompt(self):
+        """
+        Returns the queued prompt, if any, and clears it.
+        """
+        prompt, self.pending_prompt = self.pending_prompt, None
+        return prompt
+
+def session_state(session):
+    """
+    Returns the session's AppState, creating it on the session's first run.
+
+    `session` is `st.session_state`; passing it in keeps this module free of
+    a Streamlit import.
+    """
+    state = session.get(SESSION_KEY)
+    if state is None:
+        state = session[SESSION_KEY] = AppState()
+    return state
@@ -0,0 +1,112 @@
+"""
+JSON baselines shared by the benchmark scripts.
+
+Each benchmark produces a flat {metric: number} dict. `save` writes it to
+benchmarks/baselines/<name>.json together with the commit it was measured
+on, and `compare` prints the change against that file and returns the
+metrics that got worse by more than `tolerance`. Metrics ending in
+`_per_second` are better when higher; every other metric (seconds, bytes)
+is better when lower.
+
+Benchmarks that generate materials call `isolate_store` first, so their
+output goes to a throwaway directory instead of the real library.
+"""
+import atexit
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(ROOT, "benchmarks", "baselines")
+
+def current_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+def isolate_store():
+    """
+    Points the material store (store.py) at a temporary directory removed at exit.
+
+    Call before the store is first used; child processes inherit the setting.
+    """
+    directory = tempfile.mkdtemp(prefix="cbc-bench-store-")
+    os.environ["CBC_STORE_DIR"] = directory
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    return directory
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+def save(name, metrics, settings=None):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    record = {
+        "benchmark": name,
+        "commit": current_commit(),
+        "measured_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "settings": settings or {},
+        "metrics": metrics
+    }
+    with open(baseline_path(name), "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Baseline written to {os.path.relpath(baseline_path(name), ROOT)}")
+
+def compare(name, metrics, tolerance=0.2):
+    """
+    Prints every metric against the saved baseline; returns the names of regressions.
+    """
+    path = baseline_path(name)
+    if not os.path.exists(path):
+        print(f"No baseline at {os.path.relpath(path, ROOT)}; run with --save first.", file=sys.stderr)
+        return []
+    with open(path, encoding="utf-8") as f:
+        record = json.load(f)
+
+    print(f"\nAgainst baseline from commit {record.get('commit') or '?'} ({record.get('measured_at')}):")
+    regressions = []
+    for metric, value in metrics.items():
+        old = record["metrics"].get(metric)
+        if not old:
+            print(f"  {metric:<40} {value:>14.6g}   (new)")
+            continue
+        change = value / old - 1
+        worse = -change if metric.endswith("_per_second") else change
+        flag = "REGRESSION" if worse > tolerance else ""
+        if flag:
+            regressions.append(metric)
+        print(f"  {metric:<40} {value:>14.6g}   {change:+7.1%} {flag}")
+    return regressions
+
+def summarize(prefix, samples):
+    """
+    Returns {prefix_p50, prefix_p95, prefix_p99, prefix_mean} for a list of timings.
+    """
+    ordered = sorted(samples)
+    summary = {f"{prefix}_mean": sum(ordered) / len(ordered)}
+    for quantile in (50, 95, 99):
+        # Nearest rank, as instrumentation.METRICS reports it
+        summary[f"{prefix}_p{quantile}"] = ordered[max(-(-len(ordered) * quantile // 100) - 1, 0)]
+    return summary
+
+def add_arguments(parser):
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="compare the results with the stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before --compare fails (default 0.2 = 20%%)")
+
+def finish(name, metrics, args, settings=None):
+    """
+    Applies --save / --compare; returns the exit status for the benchmark script.
+    """
+    regressions = compare(name, metrics, args.tolerance) if args.compare else []
+    if args.save:
+        save(name, metrics, settings)
+    return 1 if regressions else 0
@@ -0,0 +1,95 @@
+"""
+Micro-benchmarks for the generation path behind every chat message.
+
+Times `generate_lesson_material` with a cold and a warm material cache,
+and the section stream that chat.py's `stream_response` consumes
+(`resolve_request` + `iter_resolved`): time to the first section and to
+the last. The Streamlit side of `stream_response` (markdown emission) is
+measured by bench_sessions.py, which runs the real app.
+
+    python benchmarks/bench_generate.py                 # print results
+    python benchmarks/bench_generate.py --compare       # and diff against benchmarks/baselines/generate.json
+    python benchmarks/bench_generate.py --save          # store as the new baseline
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import baseline
+from lesson_generator import MATERIAL_TYPES, generate_lesson_material, iter_resolved, resolve_request
+from material_cache import MATERIAL_CACHE
+
+GRADE = "Grade 6"
+SUBJECT = "Mathematics"
+PROMPTS = [
+    "Create a worksheet on fractions and decimals",
+    "lesson plan about the water cycle",
+    "Generate a quiz on multiplication",
+    "Make flashcards for parts of a plant",
+    "explain photosynthesis",
+    "design an activity on measuring length"
+]
+
+def requests(samples):
+    cases = itertools.cycle(itertools.product(PROMPTS, MATERIAL_TYPES))
+    return list(itertools.islice(cases, samples))
+
+def time_generate(cases, cold):
+    samples = []
+    for prompt, material_type in cases:
+        if cold:
+            MATERIAL_CACHE.clear()
+        started = time.perf_counter()
+        generate_lesson_material(prompt, GRADE, SUBJECT, material_type, "teacher")
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def time_stream(cases):
+    first_section, total = [], []
+    for prompt, material_type in cases:
+        MATERIAL_CACHE.clear()
+        started = time.perf_counter()
+        stream = iter_resolved(*resolve_request(prompt, GRADE, SUBJECT, material_type, "teacher"))
+        next(stream)
+        first_section.append(time.perf_counter() - started)
+        for _ in stream:
+            pass
+        total.append(time.perf_counter() - started)
+    return first_section, total
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--samples", type=int, default=5000)
+    baseline.add_arguments(parser)
+    args = parser.parse_args(argv)
+    baseline.isolate_store()
+
+    cases = requests(args.samples)
+    # One untimed pass so lazy regex compiles and first-call costs are not measured
+    time_generate(cases[:len(PROMPTS) * len(MATERIAL_TYPES)], cold=True)
+
+    cold = time_generate(cases, cold=True)
+    # Fill the cache, then time pure hits
+    time_generate(cases, cold=False)
+    warm = time_generate(cases, cold=False)
+    first_section, stream_total = time_stream(cases)
+
+    metrics = {}
+    metrics.update(baseline.summarize("generate_cold_seconds", cold))
+    metrics.update(baseline.summarize("generate_warm_seconds", warm))
+    metrics.update(baseline.summarize("stream_first_section_seconds", first_section))
+    metrics.update(baseline.summarize("stream_total_seconds", stream_total))
+    metrics["generate_cold_per_second"] = len(cold) / sum(cold)
+    metrics["generate_warm_per_second"] = len(warm) / sum(warm)
+
+    for metric, value in metrics.items():
+        shown = f"{value * 1e6:>12.2f} µs" if metric.endswith(("_mean", "_p50", "_p95", "_p99")) else f"{value:>12,.0f}"
+        print(f"{metric:<40} {shown}")
+    return baseline.finish("generate", metrics, args, {"samples": args.samples})
+
+if __name__ == "__main__":
+    sys.exit(main())
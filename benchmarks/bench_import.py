@@ -0,0 +1,53 @@
+"""
+Import-time check for the headless entry points.
+
+Imports each module in a fresh interpreter with `-X importtime`, reports
+the median cumulative import time, and fails if Streamlit is pulled in.
+
+    python benchmarks/bench_import.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["lesson_generator", "cli", "server"]
+RUNS = 7
+
+def import_time_us(module):
+    """
+    Returns (cumulative import time of `module` in µs, whether streamlit was imported).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    cumulative = None
+    imported_streamlit = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if name.split(".")[0] == "streamlit":
+            imported_streamlit = True
+        if name == module:
+            cumulative = int(cumulative_us)
+    return cumulative, imported_streamlit
+
+def main():
+    failed = False
+    print(f"{'module':<18} {'median ms':>10} {'streamlit':>10}")
+    for module in MODULES:
+        samples = [import_time_us(module) for _ in range(RUNS)]
+        median_ms = statistics.median(us for us, _ in samples) / 1000
+        pulls_streamlit = any(streamlit for _, streamlit in samples)
+        failed |= pulls_streamlit
+        print(f"{module:<18} {median_ms:>10.2f} {'IMPORTED' if pulls_streamlit else 'no':>10}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
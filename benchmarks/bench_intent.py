@@ -0,0 +1,99 @@
+"""
+Accuracy check and micro-benchmark for the prompt parser.
+
+Runs every prompt in intent_corpus.json through `intent.parse_prompt` and
+through the substring-based parser chat.py used before, then reports the
+accuracy and per-prompt parse time of both. Exits with status 1 if the
+current parser gets any corpus entry wrong.
+
+    python benchmarks/bench_intent.py
+"""
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from intent import GENERATE, GREETING, HELP, parse_prompt
+from material_cache import normalize_topic
+
+CORPUS_PATH = os.path.join(ROOT, "benchmarks", "intent_corpus.json")
+
+def legacy_parse(prompt, material_type, subject=None):
+    """
+    The original chat.py logic: substring tests and one replace per keyword.
+    """
+    prompt_lower = prompt.lower()
+    if any(word in prompt_lower for word in ["hello", "hi", "hey", "start"]):
+        return GREETING, ""
+    elif "help" in prompt_lower or "how" in prompt_lower:
+        return HELP, ""
+
+    topic_keywords_to_remove = {
+        "worksheet": ["worksheet", "create", "generate"],
+        "lesson_plan": ["lesson plan", "create", "write"],
+        "activity": ["activity", "create", "design"],
+        "assessment": ["test", "exam", "quiz", "assessment", "create", "generate"],
+        "flashcards": ["flashcard", "flashcards", "create", "make"],
+        "notes": ["study notes", "notes", "create", "generate", "explain", "summarize"]
+    }
+    current_prompt_for_topic = prompt_lower
+    if material_type in topic_keywords_to_remove:
+        for keyword in topic_keywords_to_remove[material_type]:
+            current_prompt_for_topic = current_prompt_for_topic.replace(keyword, "")
+    for generic_word in ["about", "on", "for", "a", "an", "the"]:
+        if current_prompt_for_topic.startswith(generic_word + " "):
+            current_prompt_for_topic = current_prompt_for_topic[len(generic_word) + 1:].strip()
+        if current_prompt_for_topic.endswith(" " + generic_word):
+            current_prompt_for_topic = current_prompt_for_topic[:-len(generic_word) - 1].strip()
+    return GENERATE, current_prompt_for_topic.strip()
+
+def score(parser, corpus):
+    """
+    Returns (intent accuracy, exact topic accuracy, list of misses).
+    """
+    intent_hits = 0
+    topic_hits = 0
+    misses = []
+    for case in corpus:
+        intent, topic = parser(case["prompt"], case["material_type"], case.get("subject"))
+        intent_ok = intent == case["intent"]
+        topic_ok = intent_ok and normalize_topic(topic) == case["topic"]
+        intent_hits += intent_ok
+        topic_hits += topic_ok
+        if not topic_ok:
+            misses.append((case["prompt"], case["intent"], case["topic"], intent, topic))
+    return intent_hits / len(corpus), topic_hits / len(corpus), misses
+
+def time_per_prompt(parser, corpus, number=2000):
+    cases = [(case["prompt"], case["material_type"], case.get("subject")) for case in corpus]
+
+    def run():
+        for prompt, material_type, subject in cases:
+            parser(prompt, material_type, subject)
+
+    return min(timeit.repeat(run, number=number, repeat=5)) / (number * len(cases)) * 1e6
+
+def main():
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    print(f"{len(corpus)} prompts in corpus\n")
+    print(f"{'parser':<10} {'intent acc':>11} {'topic acc':>10} {'µs/prompt':>10}")
+    results = {}
+    for name, parser in [("legacy", legacy_parse), ("intent", parse_prompt)]:
+        intent_acc, topic_acc, misses = score(parser, corpus)
+        results[name] = misses
+        print(f"{name:<10} {intent_acc:>10.1%} {topic_acc:>9.1%} {time_per_prompt(parser, corpus):>10.2f}")
+
+    if results["intent"]:
+        print("\nMisses:")
+        for prompt, want_intent, want_topic, got_intent, got_topic in results["intent"]:
+            print(f"  {prompt!r}: expected ({want_intent}, {want_topic!r}), got ({got_intent}, {got_topic!r})")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Classroom load test: many simulated sessions driving chat.py through AppTest.
+
+Opens `--sessions` app sessions spread over `--processes` worker
+processes and keeps them all alive, then runs `--steps` rounds in which
+every session does one random thing a user would do: change grade,
+subject or material type, click one of the example request buttons, or
+type a prompt into the chat input. Every rerun is timed. Reports
+throughput, p50/p95/p99 rerun latency, the in-app phase timings recorded
+in `instrumentation.METRICS` (sidebar, history render, streaming,
+markdown emission, ...) and resident memory growth per session, merged
+over all processes.
+
+Within a process, sessions take turns in one thread: AppTest swaps a
+process-global runtime on every run, so it cannot be driven from several
+threads at once, and a rerun of chat.py is CPU-bound, so the GIL would
+serialize them anyway. Concurrency comes from the processes, each with
+its own AppTest sessions, which run at the same time and share the CPU
+and the material store the way several server processes would.
+`--processes 1` measures what one Streamlit process sustains.
+
+Needs Streamlit installed (`pip install streamlit`).
+
+    python benchmarks/bench_sessions.py --sessions 40 --steps 15 --processes 4
+    python benchmarks/bench_sessions.py --sessions 40 --steps 15 --processes 4 --save
+    python benchmarks/bench_sessions.py --sessions 40 --steps 15 --processes 4 --compare
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+import baseline
+from app_state import SESSION_KEY
+from curriculum import CURRICULUM
+from instrumentation import METRICS
+
+APP_PATH = os.path.join(ROOT, "chat.py")
+TYPED_PROMPTS = [
+    "Create a worksheet on {topic}",
+    "lesson plan about {topic}",
+    "notes on {topic}",
+    "Generate a quiz on {topic}",
+    "hello",
+    "how do I use this?"
+]
+
+class Session:
+    """
+    One simulated user driving its own AppTest.
+    """
+
+    def __init__(self, rng, timeout):
+        self.rng = rng
+        self.app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    def run(self, widget=None):
+        started = time.perf_counter()
+        (widget or self.app).run()
+        elapsed = time.perf_counter() - started
+        if self.app.exception:
+            raise RuntimeError(f"chat.py raised: {self.app.exception[0].message}")
+        return elapsed
+
+    def _selectbox(self, label):
+        return next(box for box in self.app.sidebar.selectbox if box.label == label)
+
+    def step(self):
+        """
+        Performs one random user action; returns (action, rerun seconds).
+        """
+        # The app keeps the current choices on its AppState object
+        state = self.app.session_state[SESSION_KEY]
+        grade, subject, material_type = state.current_grade, state.current_subject, state.material_type
+
+        action = self.rng.choice(["grade", "subject", "material_type", "example", "chat", "chat"])
+        if action == "grade":
+            return action, self.run(self._selectbox("Grade Level").select(self.rng.choice(CURRICULUM.grades)))
+        if action == "subject":
+            return action, self.run(self._selectbox("Subject").select(self.rng.choice(CURRICULUM.subjects_for(grade))))
+        if action == "material_type":
+            choice = self.rng.choice(CURRICULUM.material_types_for(grade))
+            return action, self.run(self._selectbox("Material Type").select(choice))
+        if action == "example":
+            examples = CURRICULUM.example_prompts(subject, material_type)[:3]
+            if examples:
+                return action, self.run(self.app.sidebar.button(key=self.rng.choice(examples)).click())
+            action = "chat"
+
+        topics = CURRICULUM.suggestions(grade, subject) or ["fractions"]
+        prompt = self.rng.choice(TYPED_PROMPTS).format(topic=self.rng.choice(topics))
+        return action, self.run(self.app.chat_input[0].set_value(prompt))
+
+def max_rss_bytes():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def run_worker(job):
+    """
+    Runs one process's share of the sessions; returns its raw timings.
+    """
+    seed, session_count, steps, timeout = job
+    rng = random.Random(seed)
+    rss_before = max_rss_bytes()
+    started = time.monotonic()
+
+    sessions = [Session(random.Random(rng.random()), timeout) for _ in range(session_count)]
+    first_load = [session.run() for session in sessions]
+
+    reruns = {"chat": [], "example": [], "grade": [], "subject": [], "material_type": []}
+    for _ in range(steps):
+        for session in sessions:
+            action, elapsed = session.step()
+            reruns[action].append(elapsed)
+
+    return {
+        "started": started,
+        "finished": time.monotonic(),
+        "first_load": first_load,
+        "reruns": reruns,
+        "phases": METRICS.samples(),
+        "rss_growth": max_rss_bytes() - rss_before
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=10, help="actions per session")
+    parser.add_argument("--processes", type=int, default=min(4, os.cpu_count() or 1), help="worker processes the sessions are spread over")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=30, help="seconds allowed per rerun")
+    baseline.add_arguments(parser)
+    args = parser.parse_args(argv)
+    # Workers inherit the temporary store through the environment
+    baseline.isolate_store()
+
+    rng = random.Random(args.seed)
+    processes = max(min(args.processes, args.sessions), 1)
+    jobs = [
+        (rng.random(), args.sessions // processes + (number < args.sessions % processes), args.steps, args.timeout)
+        for number in range(processes)
+    ]
+    # Spawned, not forked: each worker starts with a clean Streamlit runtime
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        results = pool.map(run_worker, jobs)
+
+    # time.monotonic is system-wide, so the workers' clocks line up
+    wall = max(result["finished"] for result in results) - min(result["started"] for result in results)
+    first_load = [elapsed for result in results for elapsed in result["first_load"]]
+    reruns = {}
+    phases = {}
+    for result in results:
+        for action, samples in result["reruns"].items():
+            reruns.setdefault(action, []).extend(samples)
+        for phase, samples in result["phases"].items():
+            phases.setdefault(phase, []).extend(samples)
+    all_reruns = first_load + [elapsed for samples in reruns.values() for elapsed in samples]
+    generating = reruns["chat"] + reruns["example"]
+
+    metrics = {
+        "reruns_per_second": len(all_reruns) / wall,
+        "messages_per_second": len(generating) / wall,
+        "rss_growth_per_session_bytes": sum(result["rss_growth"] for result in results) / args.sessions
+    }
+    metrics.update(baseline.summarize("first_load_seconds", first_load))
+    metrics.update(baseline.summarize("rerun_seconds", all_reruns))
+    if generating:
+        metrics.update(baseline.summarize("message_rerun_seconds", generating))
+    for phase, samples in sorted(phases.items()):
+        metrics.update(baseline.summarize(f"phase_{phase}_seconds", samples))
+
+    print(f"{args.sessions} sessions x {args.steps} steps in {processes} processes: {len(all_reruns)} reruns in {wall:.1f}s")
+    for metric, value in metrics.items():
+        if metric.endswith("_bytes"):
+            shown = f"{value / 1024:>12,.1f} KiB"
+        elif metric.endswith("_per_second"):
+            shown = f"{value:>12,.1f}"
+        else:
+            shown = f"{value * 1000:>12.2f} ms"
+        print(f"{metric:<44} {shown}")
+
+    settings = {"sessions": args.sessions, "steps": args.steps, "processes": processes, "seed": args.seed}
+    return baseline.finish(f"sessions-{args.sessions}x{args.steps}-p{processes}", metrics, args, settings)
+
+if __name__ == "__main__":
+    sys.exit(main())
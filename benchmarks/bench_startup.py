@@ -0,0 +1,142 @@
+"""
+Cold-start and per-rerun byte budget for the Streamlit app.
+
+Without Streamlit it measures what chat.py adds on top of Streamlit
+itself: the import time of the app's own modules in a fresh interpreter,
+and the size of the CSS + banner element sent on every rerun (now and as
+the two unminified elements chat.py used to send).
+
+With Streamlit installed it also runs chat.py through AppTest and reports
+the first (cold) run, a warm rerun, and the serialized size of every
+element a rerun sends, for a fresh session and after a few messages.
+
+Exits with status 1 if a budget in BUDGETS is exceeded.
+
+    python benchmarks/bench_startup.py [--save | --compare]
+"""
+import argparse
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import textwrap
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import baseline
+from page_assets import ASSET_DIR, page_head
+
+# Modules chat.py imports besides Streamlit
+APP_MODULES = ["app_state", "curriculum", "export", "history", "instrumentation", "lesson_generator", "material_cache", "page_assets"]
+RUNS = 7
+
+BUDGETS = {
+    "page_head_bytes": 1024,
+    # Element payload of a rerun; only measured when Streamlit is installed
+    "fresh_rerun_element_bytes": 16 * 1024,
+    "chat_rerun_element_bytes": 48 * 1024
+}
+
+LEGACY_BANNER = """
+    <div class="header-banner">
+        <h1>📚 CBC Lesson Material Generator</h1>
+        <p>Create Localized Learning Materials Instantly</p>
+    </div>
+"""
+
+def app_import_ms():
+    """
+    Returns the median time to import APP_MODULES in a fresh interpreter.
+    """
+    samples = []
+    for _ in range(RUNS):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {', '.join(APP_MODULES)}"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        total_us = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative_us, name = line[len("import time:"):].split("|")
+            # Unindented names are top-level imports; the nested ones are already included
+            if name.strip() in APP_MODULES and not name[1:].startswith(" "):
+                total_us += int(cumulative_us)
+        samples.append(total_us / 1000)
+    return statistics.median(samples)
+
+def legacy_head_bytes():
+    with open(os.path.join(ASSET_DIR, "style.css"), encoding="utf-8") as f:
+        css = f.read()
+    legacy_css = "\n    <style>\n" + textwrap.indent(css, "    ") + "    </style>\n"
+    return len(legacy_css.encode("utf-8")) + len(LEGACY_BANNER.encode("utf-8"))
+
+def element_bytes(node):
+    """
+    Sums the serialized protobuf size of every element below `node` in an AppTest tree.
+    """
+    proto = getattr(node, "proto", None)
+    size = proto.ByteSize() if hasattr(proto, "ByteSize") else 0
+    for child in getattr(node, "children", {}).values():
+        size += element_bytes(child)
+    return size
+
+def app_metrics(messages=4):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(ROOT, "chat.py"), default_timeout=30)
+    started = time.perf_counter()
+    app.run()
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    app.run()
+    warm = time.perf_counter() - started
+    fresh_bytes = element_bytes(app._tree)
+
+    for number in range(messages):
+        app.chat_input[0].set_value(f"Create a worksheet on topic {number}").run()
+    chat_bytes = element_bytes(app._tree)
+    return {
+        "first_run_seconds": cold,
+        "warm_rerun_seconds": warm,
+        "fresh_rerun_element_bytes": fresh_bytes,
+        "chat_rerun_element_bytes": chat_bytes
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    baseline.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    metrics = {
+        "app_import_seconds": app_import_ms() / 1000,
+        "page_head_bytes": len(page_head().encode("utf-8")),
+        "legacy_head_bytes": legacy_head_bytes()
+    }
+    if importlib.util.find_spec("streamlit") is not None:
+        baseline.isolate_store()
+        metrics.update(app_metrics())
+    else:
+        print("Streamlit is not installed: skipping the AppTest run and rerun byte budgets.\n")
+
+    over_budget = False
+    for metric, value in metrics.items():
+        budget = BUDGETS.get(metric)
+        status = ""
+        if budget is not None:
+            over_budget |= value > budget
+            status = f"(budget {budget:,}) {'OVER BUDGET' if value > budget else 'ok'}"
+        shown = f"{value * 1000:>10.2f} ms" if metric.endswith("_seconds") else f"{value:>10,.0f} B "
+        print(f"{metric:<28} {shown} {status}")
+
+    status = baseline.finish("startup", metrics, args)
+    return 1 if over_budget else status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Correctness check and micro-benchmark for the material store.
+
+In a temporary directory, checks that `put` stores a material once and
+reads it back, that two keys with identical text share one blob, that a
+view handed out before the blob file grew stays valid while newer
+materials are read through a remapped file, that `put_later` + `flush`
+write everything queued, and that a reopened store sees it all. Then
+times `put` (one transaction per material), the caller's side of
+`put_later`, and how fast the background writer drains its queue.
+Exits with status 1 if a check fails.
+
+    python benchmarks/bench_store.py [--save | --compare]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import baseline
+from store import MaterialStore, material_key
+from templates import TEMPLATES
+
+GRADE = "Grade 6"
+SUBJECT = "Mathematics"
+
+def material(number):
+    topic = f"fractions part {number}"
+    params = {"topic": topic, "topic_title": topic.title(), "subject": SUBJECT, "grade": GRADE}
+    return "worksheet", params, TEMPLATES["worksheet"].render(params)
+
+def check(directory):
+    """
+    Returns a list of failed checks.
+    """
+    failures = []
+
+    def expect(condition, message):
+        if not condition:
+            failures.append(message)
+
+    store = MaterialStore(directory)
+    template_id, params, text = material(0)
+    key = store.put(template_id, params, text)
+    expect(key == material_key(template_id, params), "put returns the material key")
+    expect(store.read_text(key) == text, "put then read_text returns the text")
+    expect(store.get(template_id, params) == text, "get returns the text")
+    store.put(template_id, params, text)
+    expect(store.stats()["materials"] == 1, "a second put of the same key stores nothing")
+
+    # Same text under another key: a new index row, no new blob
+    duplicate_params = dict(params, material_name="copy")
+    store.put(template_id, duplicate_params, text)
+    stats = store.stats()
+    expect((stats["materials"], stats["blobs"], stats["deduplicated"]) == (2, 1, 1), f"identical text shares one blob: {stats}")
+
+    # A view taken now must survive the remap the next reads trigger
+    early_view = store.read_bytes(key)
+    later = [material(number) for number in range(1, 200)]
+    for item in later:
+        store.put(*item)
+    last_id, last_params, last_text = later[-1]
+    expect(store.get(last_id, last_params) == last_text, "materials appended after a read are readable")
+    expect(str(early_view, "utf-8") == text, "an earlier view stays valid after the remap")
+    early_view.release()
+
+    queued = [material(number) for number in range(200, 400)]
+    for item in queued:
+        store.put_later(*item)
+    store.flush()
+    expect(store.stats()["queued"] == 0, "flush empties the write queue")
+    expect(all(store.get(*item[:2]) == item[2] for item in queued), "put_later + flush writes every queued material")
+    store.close()
+
+    reopened = MaterialStore(directory)
+    expect(reopened.stats()["materials"] == 401, "a reopened store sees every material")
+    expect(reopened.get(template_id, params) == text, "a reopened store reads the first material")
+    reopened.close()
+    return failures
+
+def time_writes(directory, count):
+    items = [material(number) for number in range(count)]
+
+    store = MaterialStore(os.path.join(directory, "put"))
+    started = time.perf_counter()
+    for item in items:
+        store.put(*item)
+    put_seconds = time.perf_counter() - started
+    store.close()
+
+    store = MaterialStore(os.path.join(directory, "put_later"))
+    calls = []
+    started = time.perf_counter()
+    for item in items:
+        call_started = time.perf_counter()
+        store.put_later(*item)
+        calls.append(time.perf_counter() - call_started)
+    store.flush()
+    drain_seconds = time.perf_counter() - started
+    store.close()
+    return put_seconds, calls, drain_seconds
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--materials", type=int, default=2000)
+    baseline.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="cbc-store-check-") as directory:
+        failures = check(os.path.join(directory, "check"))
+        put_seconds, calls, drain_seconds = time_writes(directory, args.materials)
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    if not failures:
+        print("put, dedup, remap, put_later/flush and reopen checks passed\n")
+
+    metrics = {
+        "put_per_second": args.materials / put_seconds,
+        "background_write_per_second": args.materials / drain_seconds
+    }
+    metrics.update(baseline.summarize("put_later_call_seconds", calls))
+    for metric, value in metrics.items():
+        shown = f"{value * 1e6:>12.2f} µs" if metric.endswith(("_mean", "_p50", "_p95", "_p99")) else f"{value:>12,.0f}"
+        print(f"{metric:<40} {shown}")
+
+    status = baseline.finish("store", metrics, args, {"materials": args.materials})
+    return 1 if failures else status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Micro-benchmark: precompiled templates vs. the original inline f-strings.
+
+Run from the repository root:
+
+    python benchmarks/bench_templates.py
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from templates import TEMPLATES, _TEMPLATE_SOURCES, render
+
+MATERIALS = ["worksheet", "lesson_plan", "activity", "assessment", "flashcards", "notes"]
+GRADE = "Grade 4"
+SUBJECT = "Mathematics"
+TOPIC = "adding fractions with unlike denominators"
+
+def build_fstring_renderer(template_id):
+    """
+    Rebuilds the original f-string path, including the repeated `topic.title()` calls.
+    """
+    source = _TEMPLATE_SOURCES[template_id].replace("{topic_title}", "{topic.title()}")
+    return eval("lambda topic, subject, grade: f" + repr(source))
+
+def measure_peak_bytes(func):
+    """
+    Returns the peak traced memory of a single call, in bytes.
+    """
+    func()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def main(number=20000):
+    print(f"{'material':<12} {'f-string µs':>12} {'compiled µs':>12} {'speedup':>8} {'f-str peak B':>13} {'compiled peak B':>16}")
+    for material in MATERIALS:
+        fstring = build_fstring_renderer(material)
+        assert fstring(TOPIC, SUBJECT, GRADE) == render(
+            material, topic=TOPIC, topic_title=TOPIC.title(), subject=SUBJECT, grade=GRADE
+        )
+
+        def run_fstring():
+            return fstring(TOPIC, SUBJECT, GRADE)
+
+        # material_params builds this dict once per request, title() included
+        template = TEMPLATES[material]
+        params = {"topic": TOPIC, "topic_title": TOPIC.title(), "subject": SUBJECT, "grade": GRADE}
+
+        def run_compiled():
+            return template.render(params)
+
+        fstring_time = min(timeit.repeat(run_fstring, number=number, repeat=5)) / number * 1e6
+        compiled_time = min(timeit.repeat(run_compiled, number=number, repeat=5)) / number * 1e6
+        print(
+            f"{material:<12} {fstring_time:>12.2f} {compiled_time:>12.2f} "
+            f"{fstring_time / compiled_time:>7.2f}x "
+            f"{measure_peak_bytes(run_fstring):>13} {measure_peak_bytes(run_compiled):>16}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Command line entry point for headless material generation.
+
+    python cli.py catalogue
+    python cli.py generate "worksheet on fractions" --grade "Grade 4" --subject Mathematics --type worksheet
+    python cli.py batch topics.csv --type worksheet --type notes -o term1.zip
+    python cli.py differentiate "assessment on fractions" --type assessment -o fractions_set.zip
+    python cli.py serve --port 8600
+
+Nothing here imports Streamlit, so it is cheap to run from cron jobs.
+"""
+import argparse
+import json
+import sys
+
+from curriculum import CURRICULUM
+from lesson_generator import GRADES, LEVELS, MATERIAL_TYPES, ROLES, catalogue, generate_for_topic, generate_lesson_material
+
+FORMATS = ["md", "html", "print"]
+
+def cmd_catalogue(args):
+    json.dump(catalogue(), sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+def check_settings(args, material_types):
+    problems = [problem for material_type in material_types for problem in CURRICULUM.validate(args.grade, args.subject, material_type)]
+    if problems:
+        sys.exit("; ".join(dict.fromkeys(problems)))
+
+def cmd_generate(args):
+    check_settings(args, [args.type])
+    text = generate_lesson_material(args.prompt, args.grade, args.subject, args.type, args.role)
+    if args.format == "md":
+        data = text.encode("utf-8")
+    else:
+        from export import convert
+        data = convert(text, args.format)
+
+    if args.output:
+        with open(args.output, "wb") as f:
+            f.write(data)
+    else:
+        sys.stdout.buffer.write(data)
+
+def cmd_batch(args):
+    from batch import generate_batch, parse_topics
+    from export import export_zip
+
+    check_settings(args, args.type or ["worksheet"])
+    with open(args.topics, encoding="utf-8-sig") as f:
+        topics = parse_topics(f.read())
+    if not topics:
+        sys.exit(f"No topics found in {args.topics}")
+
+    result = generate_batch(
+        topics,
+        args.type or ["worksheet"],
+        lambda topic, material_type: generate_for_topic(topic, args.grade, args.subject, material_type, args.role)
+    )
+    archive = export_zip(result.documents(), args.format or ["md"])
+    with open(args.output, "wb") as f:
+        while chunk := archive.read(1024 * 1024):
+            f.write(chunk)
+    print(
+        f"{len(result)} documents in {result.elapsed:.2f}s "
+        f"({result.documents_per_second:,.0f} documents/second) -> {args.output}",
+        file=sys.stderr
+    )
+
+def cmd_differentiate(args):
+    from differentiate import DIFFERENTIATED_TYPES, generate_set
+    from export import export_zip
+
+    check_settings(args, [args.type])
+    result = generate_set(args.prompt, args.grade, args.subject, args.type, args.level or list(LEVELS), args.copy or list(ROLES))
+    if result is None:
+        sys.exit(
+            f"'{args.prompt}' does not name a topic for a {args.type} material, or {args.type} has none of the "
+            f"requested levels besides Core (differentiated types: {', '.join(DIFFERENTIATED_TYPES)})"
+        )
+    archive = export_zip(result.documents(), args.format or ["md"])
+    with open(args.output, "wb") as f:
+        while chunk := archive.read(1024 * 1024):
+            f.write(chunk)
+    print(f"{len(result)} versions in {result.elapsed * 1000:.2f} ms -> {args.output}", file=sys.stderr)
+
+def cmd_serve(args):
+    import asyncio
+
+    from server import serve
+
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="CBC Lesson Material Generator (headless)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_settings(command):
+        command.add_argument("--grade", default="Grade 4", choices=GRADES)
+        command.add_argument("--subject", default="Mathematics")
+        command.add_argument("--role", default="teacher", choices=["teacher", "student"])
+
+    commands.add_parser("catalogue", help="print grades, subjects and material types as JSON").set_defaults(func=cmd_catalogue)
+
+    generate = commands.add_parser("generate", help="generate one material from a prompt")
+    generate.add_argument("prompt")
+    add_settings(generate)
+    generate.add_argument("--type", default="worksheet", choices=list(MATERIAL_TYPES))
+    generate.add_argument("--format", default="md", choices=FORMATS)
+    generate.add_argument("-o", "--output", help="write to a file instead of stdout")
+    generate.set_defaults(func=cmd_generate)
+
+    batch = commands.add_parser("batch", help="generate every topic x material type into a ZIP")
+    batch.add_argument("topics", help="text or CSV file with one topic per line")
+    add_settings(batch)
+    batch.add_argument("--type", action="append", choices=list(MATERIAL_TYPES), help="repeat for several types")
+    batch.add_argument("--format", action="append", choices=FORMATS, help="repeat for several formats")
+    batch.add_argument("-o", "--output", default="cbc_materials.zip")
+    batch.set_defaults(func=cmd_batch)
+
+    differentiate = commands.add_parser("differentiate", help="generate one material at several levels, for teacher and student, into a ZIP")
+    differentiate.add_argument("prompt")
+    add_settings(differentiate)
+    differentiate.add_argument("--type", default="worksheet", choices=list(MATERIAL_TYPES))
+    differentiate.add_argument("--level", action="append", choices=list(LEVELS), help="repeat for several levels (default: all)")
+    differentiate.add_argument("--copy", action="append", choices=list(ROLES), help="teacher and/or student copies (default: both)")
+    differentiate.add_argument("--format", action="append", choices=FORMATS, help="repeat for several formats")
+    differentiate.add_argument("-o", "--output", default="cbc_differentiated_set.zip")
+    differentiate.set_defaults(func=cmd_differentiate)
+
+    serve = commands.add_parser("serve", help="run the HTTP endpoint")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8600)
+    serve.set_defaults(func=cmd_serve)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
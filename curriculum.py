@@ -0,0 +1,127 @@
+"""
+Precomputed index over the CBC curriculum data in curriculum.json.
+
+The index is built once per process and answers every lookup the sidebar
+and the API need (grade -> level -> subjects -> strands -> sub-strands,
+allowed material types, example prompts) with dict access, and topic
+autocomplete with a binary search over sorted sub-strand keys.
+"""
+import json
+import os
+from bisect import bisect_left
+
+CURRICULUM_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "curriculum.json")
+
+class CurriculumIndex:
+    """
+    Read-only lookups over one version of the curriculum data.
+    """
+
+    def __init__(self, data):
+        self.version = data["version"]
+        self.levels = {}
+        self.grades = []
+        self._level_by_grade = {}
+        self._material_types_by_level = {}
+        self._strands = {}
+        self._substrands = {}
+        self._topic_keys = {}
+
+        for level in data["levels"]:
+            name = level["name"]
+            subjects = level["subjects"]
+            self.levels[name] = list(subjects)
+            self._material_types_by_level[name] = list(level["material_types"])
+            for number in level["grades"]:
+                grade = f"Grade {number}"
+                self.grades.append(grade)
+                self._level_by_grade[grade] = name
+
+            for subject, details in subjects.items():
+                strands = {strand: list(substrands) for strand, substrands in details["strands"].items()}
+                self._strands[name, subject] = strands
+                self._substrands[name, subject] = [
+                    substrand for substrands in strands.values() for substrand in substrands
+                ]
+                # Every word of a sub-strand starts a key, so "root" finds "Squares and square roots"
+                keys = []
+                for substrand in self._substrands[name, subject]:
+                    words = substrand.lower().split()
+                    keys.extend((" ".join(words[i:]), substrand) for i in range(len(words)))
+                keys.sort()
+                self._topic_keys[name, subject] = keys
+
+        self._example_prompts = data.get("example_prompts", {})
+        self._example_cache = {}
+
+    # --- LOOKUPS ---
+    def level_for(self, grade):
+        return self._level_by_grade[grade]
+
+    def subjects_for(self, grade):
+        return self.levels[self._level_by_grade[grade]]
+
+    def material_types_for(self, grade):
+        return self._material_types_by_level[self._level_by_grade[grade]]
+
+    def strands_for(self, grade, subject):
+        """
+        Returns {strand: [sub-strands]} for a subject at a grade.
+        """
+        return self._strands.get((self._level_by_grade[grade], subject), {})
+
+    def suggestions(self, grade, subject, limit=None):
+        """
+        Returns the sub-strand names of a subject, in curriculum order.
+        """
+        substrands = self._substrands.get((self._level_by_grade[grade], subject), [])
+        return substrands if limit is None else substrands[:limit]
+
+    def autocomplete(self, grade, subject, prefix, limit=8):
+        """
+        Returns sub-strands containing a word that starts with `prefix`.
+        """
+        keys = self._topic_keys.get((self._level_by_grade[grade], subject), [])
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return self.suggestions(grade, subject, limit)
+
+        matches = []
+        for key, substrand in keys[bisect_left(keys, (prefix,)):]:
+            if not key.startswith(prefix) or len(matches) == limit:
+                break
+            if substrand not in matches:
+                matches.append(substrand)
+        return matches
+
+    def example_prompts(self, subject, material_type):
+        """
+        Returns the sidebar example prompts for a material type, formatted once per subject.
+        """
+        key = (subject, material_type)
+        examples = self._example_cache.get(key)
+        if examples is None:
+            templates = self._example_prompts.get(material_type, self._example_prompts.get("worksheet", []))
+            examples = self._example_cache[key] = [template.format(subject=subject) for template in templates]
+        return examples
+
+    def validate(self, grade, subject, material_type=None):
+        """
+        Returns a list of problems with the combination; empty when it is valid.
+        """
+        level = self._level_by_grade.get(grade)
+        if level is None:
+            return [f"Unknown grade '{grade}'"]
+        problems = []
+        if (level, subject) not in self._strands:
+            problems.append(f"'{subject}' is not offered in {grade}")
+        if material_type is not None and material_type not in self._material_types_by_level[level]:
+            problems.append(f"'{material_type}' materials are not available for {grade}")
+        return problems
+
+def load_curriculum(path=CURRICULUM_PATH):
+    with open(path, encoding="utf-8") as f:
+        return CurriculumIndex(json.load(f))
+
+# Built once per process
+CURRICULUM = load_curriculum()
@@ -0,0 +1,232 @@
+"""
+Differentiated sets: one material at several difficulty levels and for
+both teacher and student, from a single prompt parse and a single render.
+
+Every section of the material is rendered once and shared by all
+variants. Each level other than Core follows a plan in LEVEL_SECTIONS:
+the sections it leaves out, and edits to the sections that state marks
+so the totals match what is left. Those sections are re-rendered per
+level; the level block after the header says what this version leaves
+out. Materials without a plan for a level are not offered at it. Student
+copies also leave out the sections meant for the teacher (teacher's
+notes, marking schemes, classroom instructions).
+"""
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+from export import slugify
+from instrumentation import METRICS
+from lesson_generator import LEVELS, MATERIAL_TYPES, ROLES, resolve_request
+from templates import TEMPLATES, CompiledTemplate, template_for
+
+# Sections whose heading contains one of these are left out of student copies
+TEACHER_SECTION_MARKERS = ("Teacher's Notes", "TEACHER NOTES", "MARKING SCHEME", "Instructions for Teachers")
+
+# Materials written for the teacher throughout; they only get teacher copies
+TEACHER_ONLY_TEMPLATES = {"lesson_plan"}
+
+# The level every material is offered at: the template as written
+CORE_LEVEL = "core"
+
+# dropped: headings of the sections left out
+# edits:   [(old, new)] text edits to the sections that state marks
+# summary: what the level block tells readers this version leaves out
+LevelPlan = namedtuple("LevelPlan", "dropped edits summary")
+
+_WORKSHEET_TOTAL = ("- **Total: 40 marks**", "- **Total: 30 marks**")
+_ASSESSMENT_TOTALS = [
+    ("**Total Marks:** 50", "**Total Marks:** 40"),
+    ("| **TOTAL** | **50** | |", "| **TOTAL** | **40** | |"),
+    (
+        "- 45-50: Exceeds Expectations\n- 35-44: Meets Expectations\n- 25-34: Approaches Expectations\n- Below 25: Needs Support",
+        "- 36-40: Exceeds Expectations\n- 28-35: Meets Expectations\n- 20-27: Approaches Expectations\n- Below 20: Needs Support"
+    )
+]
+
+# (template, level) -> LevelPlan for every level other than Core
+LEVEL_SECTIONS = {
+    ("worksheet", "support"): LevelPlan(
+        ["Part C: Challenge Section"],
+        [("- Critical thinking: 10 marks\n", ""), _WORKSHEET_TOTAL, ("- Challenge advanced learners with Part C\n", "")],
+        "Part C (Challenge Section) is left out, so the worksheet is marked out of 30."
+    ),
+    ("worksheet", "extension"): LevelPlan(
+        ["Part A: Understanding the Concept"],
+        [("- Understanding: 10 marks\n", ""), _WORKSHEET_TOTAL, ("- Support struggling learners with Part A\n", "")],
+        "Part A (Understanding the Concept) is left out, so the worksheet is marked out of 30."
+    ),
+    ("assessment", "support"): LevelPlan(
+        ["SECTION D: Extended Response"],
+        [("| Section D: Extended Response | 10 | |\n", "")] + _ASSESSMENT_TOTALS,
+        "Section D (Extended Response) is left out, so the assessment is marked out of 40."
+    ),
+    ("assessment", "extension"): LevelPlan(
+        ["SECTION A: Multiple Choice"],
+        [("| Section A: Multiple Choice | 10 | |\n", "")] + _ASSESSMENT_TOTALS,
+        "Section A (Multiple Choice) is left out, so the assessment is marked out of 40."
+    ),
+    ("activity", "support"): LevelPlan(
+        ["EXTENSION ACTIVITIES"],
+        [],
+        "The extension activities for fast finishers are left out."
+    ),
+    ("flashcards", "support"): LevelPlan(
+        ["FLASHCARD 7\n", "FLASHCARD 10\n"],
+        [],
+        "Card 7 (comparing two ideas) and card 10 (the community challenge) are left out."
+    ),
+    ("flashcards", "extension"): LevelPlan(
+        ["FLASHCARD 1\n", "FLASHCARD 9\n"],
+        [],
+        "Card 1 (the definition) and card 9 (true or false) are left out."
+    )
+}
+
+_LEVEL_HEADINGS = {
+    "support": "🟢 Support Level",
+    "core": "🟡 Core Level",
+    "extension": "🔴 Extension Level"
+}
+
+# Slots: {topic}
+_LEVEL_GUIDANCE = {
+    ("support", "teacher"): "**Differentiation notes:** Read every instruction aloud and work through the first question of each part together. Allow extra time, accept oral answers, and let learners use concrete objects (bottle tops, sticks, seeds) while working on {topic}.",
+    ("support", "student"): "**Tips for you:** Start with the first questions and take your time. Use objects around you to help you think about {topic}. Ask a friend or your teacher when you get stuck.",
+    ("core", "teacher"): "**Differentiation notes:** Learners work through the material as written. Check their working on {topic} as you move around the class and pair learners who finish early with those who need help.",
+    ("core", "student"): "**Tips for you:** Try every part and show your working. Check your answers about {topic} when you finish.",
+    ("extension", "teacher"): "**Differentiation notes:** Let learners work independently and spend most of their time on the hardest tasks. Ask them to explain {topic} to a classmate and to write one harder question of their own.",
+    ("extension", "student"): "**Challenge yourself:** Spend your time on the hardest tasks. Make up your own difficult question about {topic} and swap it with a classmate."
+}
+
+Variant = namedtuple("Variant", "level role text")
+
+def levels_for(template_id):
+    """
+    Returns the levels a template is offered at: Core plus every level it has a plan for.
+    """
+    return [level for level in LEVELS if level == CORE_LEVEL or (template_id, level) in LEVEL_SECTIONS]
+
+# Material types offered as differentiated sets: those with at least one level besides Core
+DIFFERENTIATED_TYPES = [
+    material_type for material_type in MATERIAL_TYPES
+    if template_for(material_type) in TEMPLATES and len(levels_for(template_for(material_type))) > 1
+]
+
+@lru_cache(maxsize=None)
+def _level_plan(template_id, level):
+    """
+    Returns (teacher section indexes, student section indexes, {index: CompiledTemplate},
+    {role: level block CompiledTemplate}) for one level; the first dict holds the
+    sections re-rendered with level-specific marks.
+    """
+    sections = TEMPLATES[template_id].sections
+    plan = LEVEL_SECTIONS.get((template_id, level))
+    if plan is None and level != CORE_LEVEL:
+        raise ValueError(f"{template_id} has no plan for the {level} level")
+    dropped, edits, summary = plan or ((), (), None)
+
+    teacher = [
+        i for i in range(1, len(sections))
+        if not any(heading in sections[i].source for heading in dropped)
+    ]
+    if len(teacher) != len(sections) - 1 - len(dropped):
+        raise ValueError(f"LEVEL_SECTIONS for {template_id}/{level} does not match one section per heading")
+
+    replaced = {}
+    for i in teacher:
+        source = sections[i].source
+        for old, new in edits:
+            source = source.replace(old, new)
+        if source != sections[i].source:
+            replaced[i] = CompiledTemplate(f"{template_id}#{i}_{level}", source, split_sections=False)
+    applied = sum(any(old in sections[i].source for i in teacher) for old, _ in edits)
+    if applied != len(edits):
+        raise ValueError(f"LEVEL_SECTIONS for {template_id}/{level} has edits that match no section")
+
+    student = tuple(
+        i for i in teacher
+        if not any(marker in sections[i].source for marker in TEACHER_SECTION_MARKERS)
+    )
+
+    # The block only describes sections this plan actually leaves out
+    summary_line = f"**In this version:** {summary}\n\n" if summary else ""
+    blocks = {
+        role: CompiledTemplate(
+            f"level_{template_id}_{level}_{role}",
+            f"\n## {_LEVEL_HEADINGS[level]}\n\n{summary_line}{_LEVEL_GUIDANCE[level, role]}\n\n---\n",
+            split_sections=False
+        )
+        for role in ROLES
+    }
+    return tuple(teacher), student, replaced, blocks
+
+class DifferentiatedSet:
+    """
+    All level/role variants of one material.
+    """
+
+    def __init__(self, template_id, params, material_type, variants, elapsed):
+        self.template_id = template_id
+        self.params = params
+        self.material_type = material_type
+        self.variants = variants
+        self.elapsed = elapsed
+
+    def __len__(self):
+        return len(self.variants)
+
+    def title(self, variant):
+        return f"{LEVELS[variant.level]} · {ROLES[variant.role]}"
+
+    def documents(self):
+        """
+        Yields (file name stem, markdown) for every variant, for export.
+        """
+        stem = slugify(f"{self.material_type} {self.params['topic']}")
+        for variant in self.variants:
+            yield f"{stem}-{variant.level}-{variant.role}", variant.text
+
+def render_set(template_id, params, levels=tuple(LEVELS), roles=tuple(ROLES)):
+    """
+    Returns [Variant] for every level x role, rendering each shared section once.
+
+    Levels the template has no plan for (see `levels_for`) are skipped.
+    """
+    if template_id in TEACHER_ONLY_TEMPLATES:
+        roles = ["teacher"]
+    offered = levels_for(template_id)
+    levels = [level for level in levels if level in offered]
+    rendered = [section.render(params) for section in TEMPLATES[template_id].sections]
+
+    variants = []
+    for level in levels:
+        teacher, student, replaced, blocks = _level_plan(template_id, level)
+        # Only the sections that state marks are rendered again for this level
+        level_rendered = rendered
+        if replaced:
+            level_rendered = rendered.copy()
+            for i, section in replaced.items():
+                level_rendered[i] = section.render(params)
+        for role in roles:
+            parts = [rendered[0], blocks[role].render(params)]
+            parts.extend(level_rendered[i] for i in (student if role == "student" else teacher))
+            variants.append(Variant(level, role, "".join(parts)))
+    return variants
+
+def generate_set(prompt, grade, subject, material_type, levels=tuple(LEVELS), roles=tuple(ROLES)):
+    """
+    Parses `prompt` once and returns a DifferentiatedSet, or None when the
+    prompt does not ask for a material (a greeting, a help request or an
+    unsupported material type) or the material has no level plans
+    (see DIFFERENTIATED_TYPES).
+    """
+    started = time.perf_counter()
+    template_id, params, cache_key = resolve_request(prompt, grade, subject, material_type, "teacher")
+    if cache_key is None or "topic" not in params or len(levels_for(template_id)) < 2:
+        return None
+    with METRICS.timer("differentiated_set"):
+        variants = render_set(template_id, params, levels, roles)
+    if not variants:
+        return None
+    return DifferentiatedSet(template_id, params, material_type, variants, time.perf_counter() - started)
@@ -0,0 +1,206 @@
+"""
+Export of generated materials as Markdown, HTML and print-ready HTML.
+
+Conversions are cached by content hash, so downloading the same material
+again costs nothing. ZIP archives are written one document at a time into a
+spooled temporary file that moves to disk once it grows past a few
+megabytes, so large class sets never sit in memory as a whole.
+"""
+import hashlib
+import html
+import re
+import tempfile
+import zipfile
+from functools import lru_cache
+
+from material_cache import MaterialCache
+
+@lru_cache(maxsize=None)
+def _python_markdown():
+    """
+    Returns python-markdown if installed, else None; imported on the first
+    conversion so the app does not pay for it at start-up.
+    """
+    try:
+        import markdown
+    except ImportError:  # optional: richer HTML when python-markdown is installed
+        return None
+    return markdown
+
+EXPORT_FORMATS = {
+    "md": "📝 Markdown (.md)",
+    "html": "🌐 Web page (.html)",
+    "print": "🖨️ Print-ready (.print.html, save as PDF)",
+}
+
+FILE_EXTENSIONS = {"md": ".md", "html": ".html", "print": ".print.html"}
+
+# Converted documents, shared by every session
+EXPORT_CACHE = MaterialCache(max_entries=4096, max_bytes=128 * 1024 * 1024, ttl_seconds=6 * 3600)
+
+# Archives larger than this are spooled to disk while being written
+SPOOL_LIMIT = 8 * 1024 * 1024
+
+_PAGE_STYLE = """
+body { font-family: Georgia, "Times New Roman", serif; line-height: 1.5; max-width: 800px; margin: 2em auto; color: #111; }
+table { border-collapse: collapse; margin: 1em 0; }
+th, td { border: 1px solid #999; padding: 4px 10px; text-align: left; }
+blockquote { border-left: 4px solid #667eea; margin: 0.5em 0; padding-left: 1em; }
+hr { border: none; border-top: 1px solid #bbb; }
+"""
+
+_PRINT_STYLE = """
+@page { size: A4; margin: 18mm 16mm; }
+body { max-width: none; margin: 0; font-size: 11pt; }
+h1, h2, h3 { page-break-after: avoid; }
+table, blockquote { page-break-inside: avoid; }
+hr { border-top: 1px dashed #999; }
+"""
+
+# --- 1. MARKDOWN TO HTML ---
+_INLINE_RULES = [
+    (re.compile(r"\*\*(.+?)\*\*"), r"<strong>\1</strong>"),
+    (re.compile(r"(?<![\w_])_([^_\s](?:[^_]*[^_\s])?)_(?![\w_])"), r"<em>\1</em>"),
+    (re.compile(r"(?<![\w*])\*([^*\s](?:[^*]*[^*\s])?)\*(?![\w*])"), r"<em>\1</em>"),
+]
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*]|(\d+)\.)\s+(.*)$")
+_CHECKBOX = re.compile(r"^\[ \]\s*")
+
+def _inline(text):
+    text = html.escape(text, quote=False)
+    for pattern, replacement in _INLINE_RULES:
+        text = pattern.sub(replacement, text)
+    return text
+
+def _table(rows):
+    cells = [[cell.strip() for cell in row.strip().strip("|").split("|")] for row in rows]
+    # The second row is the |---|---| separator
+    header, body = cells[0], cells[2:] if len(cells) > 1 else []
+    out = ["<table>", "<tr>" + "".join(f"<th>{_inline(cell)}</th>" for cell in header) + "</tr>"]
+    out.extend("<tr>" + "".join(f"<td>{_inline(cell)}</td>" for cell in row) + "</tr>" for row in body)
+    out.append("</table>")
+    return "\n".join(out)
+
+def markdown_to_html(text):
+    """
+    Converts the markdown used by the templates to an HTML fragment.
+    """
+    markdown = _python_markdown()
+    if markdown is not None:
+        return markdown.markdown(text, extensions=["tables", "sane_lists"])
+
+    out = []
+    paragraph = []
+    list_tag = None
+    lines = text.split("\n")
+    i = 0
+
+    def close_blocks():
+        nonlocal list_tag
+        if paragraph:
+            out.append("<p>" + "<br>\n".join(paragraph) + "</p>")
+            paragraph.clear()
+        if list_tag:
+            out.append(f"</{list_tag}>")
+            list_tag = None
+
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+
+        if not stripped:
+            close_blocks()
+        elif stripped == "---":
+            close_blocks()
+            out.append("<hr>")
+        elif _HEADING.match(stripped):
+            close_blocks()
+            hashes, title = _HEADING.match(stripped).groups()
+            out.append(f"<h{len(hashes)}>{_inline(title)}</h{len(hashes)}>")
+        elif stripped.startswith("|"):
+            close_blocks()
+            rows = []
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                rows.append(lines[i])
+                i += 1
+            out.append(_table(rows))
+            continue
+        elif stripped.startswith(">"):
+            close_blocks()
+            quoted = []
+            while i < len(lines) and lines[i].strip().startswith(">"):
+                quoted.append(_inline(lines[i].strip()[1:].strip()))
+                i += 1
+            out.append("<blockquote>" + "<br>\n".join(quoted) + "</blockquote>")
+            continue
+        elif _LIST_ITEM.match(line):
+            number, item = _LIST_ITEM.match(line).groups()
+            tag = "ol" if number else "ul"
+            if paragraph or list_tag != tag:
+                close_blocks()
+                # Keep the numbering of lists split by other blocks
+                out.append(f'<ol start="{number}">' if number and number != "1" else f"<{tag}>")
+                list_tag = tag
+            item = _CHECKBOX.sub("☐ ", item)
+            out.append(f"<li>{_inline(item)}</li>")
+        else:
+            if list_tag:
+                close_blocks()
+            paragraph.append(_inline(stripped))
+        i += 1
+
+    close_blocks()
+    return "\n".join(out)
+
+def html_document(text, title, print_ready=False):
+    """
+    Wraps converted markdown in a standalone HTML page.
+    """
+    style = _PAGE_STYLE + (_PRINT_STYLE if print_ready else "")
+    return (
+        "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+        f"<title>{html.escape(title)}</title>\n<style>{style}</style>\n</head>\n"
+        f"<body>\n{markdown_to_html(text)}\n</body>\n</html>\n"
+    )
+
+# --- 2. CACHED CONVERSION ---
+def convert(text, fmt, title="CBC Material"):
+    """
+    Returns `text` converted to `fmt` ("md", "html" or "print") as UTF-8 bytes.
+    """
+    key = (hashlib.sha1(text.encode("utf-8")).hexdigest(), fmt, title)
+    return EXPORT_CACHE.get_or_create(key, lambda: _convert(text, fmt, title))
+
+def _convert(text, fmt, title):
+    if fmt == "md":
+        return text.encode("utf-8")
+    if fmt == "html":
+        return html_document(text, title).encode("utf-8")
+    if fmt == "print":
+        return html_document(text, title, print_ready=True).encode("utf-8")
+    raise ValueError(f"Unknown export format: {fmt}")
+
+# --- 3. ARCHIVES ---
+def slugify(text, max_length=60):
+    """
+    Turns a title into a safe file name stem.
+    """
+    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    return slug[:max_length].rstrip("-") or "material"
+
+def export_zip(documents, formats):
+    """
+    Writes every (name, text) in `documents` to a ZIP in each of `formats`.
+
+    `documents` may be a generator; each document is converted and written
+    before the next one is produced. Returns a binary file object positioned
+    at the start of the archive.
+    """
+    archive = tempfile.SpooledTemporaryFile(max_size=SPOOL_LIMIT)
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, text in documents:
+            for fmt in formats:
+                zf.writestr(name + FILE_EXTENSIONS[fmt], convert(text, fmt, title=name))
+    archive.seek(0)
+    return archive
@@ -0,0 +1,117 @@
+"""
+Compact chat history for the CBC Lesson Generator.
+
+Assistant messages are stored as (template_id, params) references and
+re-rendered on demand instead of keeping every multi-kilobyte material in
+session state. Past an optional in-memory cap, the oldest records spill to a
+temporary JSON-lines file and are read back by offset when needed.
+"""
+import json
+import tempfile
+from array import array
+
+from export import slugify
+from templates import render
+
+# A record is (role, template_id, payload): payload is the text itself when
+# template_id is None, otherwise the template's slot values.
+USER = "user"
+ASSISTANT = "assistant"
+
+class ChatHistory:
+    """
+    Append-only chat log holding compact message records.
+    """
+
+    def __init__(self, max_in_memory=200):
+        self.max_in_memory = max_in_memory
+        self._records = []
+        self._spill_file = None
+        self._spill_offsets = array("q")
+        self.request_count = 0
+
+    def __len__(self):
+        return len(self._spill_offsets) + len(self._records)
+
+    def append_user(self, text):
+        self.request_count += 1
+        self._append((USER, None, text))
+
+    def append_material(self, template_id, params):
+        self._append((ASSISTANT, template_id, params))
+
+    def record(self, index):
+        """
+        Returns the record at `index`, reading it back from disk if it was spilled.
+        """
+        if index < 0:
+            index += len(self)
+        spilled = len(self._spill_offsets)
+        if index >= spilled:
+            return self._records[index - spilled]
+
+        self._spill_file.seek(self._spill_offsets[index])
+        role, template_id, payload = json.loads(self._spill_file.readline())
+        return role, template_id, payload
+
+    def iter_records(self, start=0, stop=None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(max(start, 0), stop):
+            yield self.record(index)
+
+    def clear(self):
+        self._records = []
+        self.request_count = 0
+        self._spill_offsets = array("q")
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def _append(self, record):
+        self._records.append(record)
+        if self.max_in_memory is not None and len(self._records) > self.max_in_memory:
+            self._spill(self._records.pop(0))
+
+    def _spill(self, record):
+        if self._spill_file is None:
+            # Deleted automatically when closed or garbage collected
+            self._spill_file = tempfile.TemporaryFile(mode="w+", encoding="utf-8", prefix="cbc_history_")
+        self._spill_file.seek(0, 2)
+        self._spill_offsets.append(self._spill_file.tell())
+        self._spill_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+# --- RENDERING HELPERS ---
+def message_content(record):
+    """
+    Returns the full markdown for a record, re-rendering materials from their template.
+    """
+    _, template_id, payload = record
+    if template_id is None:
+        return payload
+    return render(template_id, **payload)
+
+def message_summary(record, width=70):
+    """
+    Returns a one-line description of a record for collapsed views.
+    """
+    role, template_id, payload = record
+    if template_id is None:
+        text = " ".join(payload.split())
+    elif "topic" in payload:
+        text = f"{template_id.replace('_', ' ').title()}: {payload['topic_title']} ({payload['grade']} {payload['subject']})"
+    else:
+        text = template_id.replace("_", " ").capitalize()
+    prefix = "🧑" if role == USER else "🤖"
+    return f"{prefix} {text if len(text) <= width else text[:width - 1] + '…'}"
+
+def material_documents(history):
+    """
+    Yields (file name stem, markdown) for every generated material, oldest first.
+    """
+    number = 0
+    for record in history.iter_records():
+        _, template_id, payload = record
+        if template_id is None or "topic" not in payload:
+            continue
+        number += 1
+        yield f"{number:03d}-{slugify(template_id + ' ' + payload['topic'])}", message_content(record)
@@ -0,0 +1,175 @@
+"""
+Timing and profiling for the CBC Lesson Generator.
+
+`METRICS` is a process-wide registry of per-phase timings (sidebar build,
+history render, intent parsing, template render, streaming, time to the
+first streamed section, markdown emission, whole reruns and API
+requests). Each phase keeps a bounded window of recent samples for
+percentiles plus running totals, and the registry can be dumped in the
+Prometheus text exposition format.
+
+`SessionProfiler` wraps a single rerun in cProfile and tracemalloc when a
+session switches profiling on from the admin page.
+"""
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from material_cache import MATERIAL_CACHE
+
+PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+
+# --- 1. TIMING REGISTRY ---
+class PhaseStats:
+    """
+    Running totals and a window of recent samples for one phase.
+    """
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self, window):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=window)
+
+class MetricsRegistry:
+    """
+    Thread-safe per-phase timing registry shared by every session.
+    """
+
+    def __init__(self, window=2048):
+        self.window = window
+        self._phases = {}
+        self._lock = threading.Lock()
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            stats = self._phases.get(phase)
+            if stats is None:
+                stats = self._phases[phase] = PhaseStats(self.window)
+            stats.count += 1
+            stats.total += seconds
+            stats.samples.append(seconds)
+
+    def samples(self):
+        """
+        Returns {phase: [recent samples]}, e.g. to merge registries of several processes.
+        """
+        with self._lock:
+            return {phase: list(stats.samples) for phase, stats in self._phases.items()}
+
+    @contextmanager
+    def timer(self, phase):
+        """
+        Times the body of a `with` block under `phase`.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - started)
+
+    def snapshot(self):
+        """
+        Returns {phase: {"count", "total", "mean", "p50", "p90", "p95", "p99"}} in seconds.
+        """
+        with self._lock:
+            phases = {phase: (stats.count, stats.total, sorted(stats.samples)) for phase, stats in self._phases.items()}
+
+        summary = {}
+        for phase, (count, total, samples) in sorted(phases.items()):
+            row = {"count": count, "total": total, "mean": total / count if count else 0.0}
+            for quantile in PERCENTILES:
+                row[f"p{round(quantile * 100)}"] = _percentile(samples, quantile)
+            summary[phase] = row
+        return summary
+
+    def prometheus_text(self, gauges=None):
+        """
+        Renders every phase as a Prometheus summary, plus optional extra gauges.
+        """
+        lines = [
+            "# HELP cbc_phase_seconds Time spent per request phase.",
+            "# TYPE cbc_phase_seconds summary"
+        ]
+        for phase, row in self.snapshot().items():
+            for quantile in PERCENTILES:
+                lines.append(f'cbc_phase_seconds{{phase="{phase}",quantile="{quantile}"}} {row[f"p{round(quantile * 100)}"]:.9f}')
+            lines.append(f'cbc_phase_seconds_sum{{phase="{phase}"}} {row["total"]:.9f}')
+            lines.append(f'cbc_phase_seconds_count{{phase="{phase}"}} {row["count"]}')
+
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._phases.clear()
+
+def _percentile(samples, quantile):
+    # Nearest rank: the smallest sample with at least `quantile` of the samples at or below it
+    if not samples:
+        return 0.0
+    return samples[max(math.ceil(quantile * len(samples)) - 1, 0)]
+
+METRICS = MetricsRegistry()
+
+def metrics_text():
+    """
+    Returns the Prometheus dump of `METRICS` plus the shared material cache counters.
+    """
+    gauges = {f"cbc_material_cache_{name}": value for name, value in MATERIAL_CACHE.stats().items()}
+    return METRICS.prometheus_text(gauges)
+
+# --- 2. PER-SESSION PROFILING ---
+class SessionProfiler:
+    """
+    Optional cProfile + tracemalloc capture of one Streamlit rerun.
+
+    tracemalloc is process-wide, so allocations of other sessions running at
+    the same time are included in the peak.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.last_report = None
+        self.last_peak_bytes = None
+        self._profile = None
+        self._started_tracemalloc = False
+
+    def start(self):
+        if not self.enabled:
+            return
+        # Imported on first use: the profiling modules are not needed on the start-up path
+        import cProfile
+        import tracemalloc
+
+        if self._profile is not None:
+            # The previous rerun ended early (st.rerun), discard it
+            self._profile.disable()
+        self._profile = cProfile.Profile()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._profile.enable()
+
+    def stop(self, limit=25):
+        if self._profile is None:
+            return
+        import io
+        import pstats
+        import tracemalloc
+
+        self._profile.disable()
+        _, self.last_peak_bytes = tracemalloc.get_traced_memory()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(limit)
+        self.last_report = out.getvalue()
+        self._profile = None
@@ -0,0 +1,169 @@
+"""
+Intent classification and topic extraction for chat prompts.
+
+`parse_prompt` lowercases the prompt and walks it once with a compiled,
+word-boundary regex alternation to classify the intent and cut the topic
+out of it. Request and material words ("create", "worksheet", "exam
+questions") are then trimmed from the ends of the topic only, so a topic
+that contains one ("formative assessment tool") keeps it. Both regexes
+are compiled on first use.
+"""
+import re
+from collections import namedtuple
+
+ParsedPrompt = namedtuple("ParsedPrompt", ["intent", "topic"])
+
+GREETING = "greeting"
+HELP = "help"
+GENERATE = "generate"
+
+# --- 1. VOCABULARY ---
+# Only count as a greeting when they open the prompt ("hi there", not "this")
+GREETING_WORDS = ["hello", "hi", "hey", "start", "good morning", "good afternoon", "habari", "jambo"]
+# "help" anywhere, or a question that opens with "how"
+HELP_WORDS = ["help"]
+LEADING_HELP_WORDS = ["how"]
+
+# Action and material words trimmed from the ends of the topic
+TOPIC_KEYWORDS = {
+    "worksheet": ["worksheet", "practice problems", "create", "generate"],
+    "lesson_plan": ["lesson plan", "lesson", "plan", "create", "write"],
+    "activity": ["activity", "experiment", "create", "design"],
+    "assessment": ["test", "exam", "quiz", "assessment", "questions", "rubric", "create", "generate"],
+    "quiz": ["test", "exam", "quiz", "assessment", "questions", "create", "generate"],
+    "flashcards": ["flashcard", "flashcards", "create", "make"],
+    "project": ["project", "create", "design"],
+    "notes": ["study notes", "notes", "create", "generate", "explain", "summarize"]
+}
+
+# Request verbs stripped whatever the material type
+ACTION_WORDS = ["create", "generate", "make", "write", "design", "prepare", "give me"]
+
+# Words that introduce the topic when only request words come before them
+# ("a worksheet on fractions"); otherwise part of it ("fractions on a number line")
+TOPIC_MARKERS = ["on", "about"]
+# Filler trimmed from either end of the topic
+GENERIC_WORDS = {"about", "on", "for", "with", "a", "an", "the", "of", "me", "please"}
+# "for grade 4", "class 7" and similar references to the learners' level
+GRADE_REFERENCE = r"(?:for\s+)?(?:grade|class|standard|std)\s*\d+"
+
+# --- 2. COMPILED MATCHERS ---
+def _alternation(words):
+    # Longest first so "study notes" wins over "notes"
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+def _compile():
+    return re.compile(
+        rf"(?<![\w'-])(?:(?P<greeting>{_alternation(GREETING_WORDS)})"
+        rf"|(?P<help>{_alternation(HELP_WORDS)})"
+        rf"|(?P<leading_help>{_alternation(LEADING_HELP_WORDS)})"
+        rf"|(?P<marker>{_alternation(TOPIC_MARKERS)})"
+        rf"|(?P<grade>{GRADE_REFERENCE}))(?![\w'-])"
+    )
+
+def _compile_edges(words, request_words):
+    # Runs of whole words at the start and at the end of a single-spaced topic,
+    # and a request word ending the text ("... worksheet")
+    alternation = _alternation(words)
+    return (
+        re.compile(rf"(?:(?:{alternation})(?: |$))+"),
+        re.compile(rf"(?:(?:^| )(?:{alternation}))+$"),
+        re.compile(rf"(?:^| )(?:{_alternation(request_words)})$")
+    )
+
+# Compiled on first use to keep import time low
+_MATCHERS = {}
+
+def _matcher():
+    matcher = _MATCHERS.get(None)
+    if matcher is None:
+        matcher = _MATCHERS[None] = _compile()
+    return matcher
+
+def _edges(material_type):
+    if material_type not in TOPIC_KEYWORDS:
+        material_type = ""
+    edges = _MATCHERS.get(material_type)
+    if edges is None:
+        request_words = set(TOPIC_KEYWORDS.get(material_type, [])) | set(ACTION_WORDS)
+        edges = _MATCHERS[material_type] = _compile_edges(request_words | GENERIC_WORDS, request_words)
+    return edges
+
+_FIRST_WORD = re.compile(r"\w")
+# Punctuation, keeping apostrophes and hyphens inside words ("week's", "hands-on")
+_PUNCTUATION = re.compile(r"[^\w'\-\s]+|(?<!\w)['-]|['-](?!\w)")
+
+# --- 3. PARSER ---
+def parse_prompt(prompt, material_type, subject=None):
+    """
+    Classifies `prompt` as a greeting, help request or generation request.
+
+    `subject`, when given, counts as a request word before a topic marker
+    ("a Mathematics worksheet on fractions", "study notes on Mathematics
+    on basic concepts").
+
+    Returns ParsedPrompt(intent, topic); topic is "" unless intent is GENERATE.
+    """
+    text = prompt.lower()
+    first_word = _FIRST_WORD.search(text)
+    opening = first_word.start() if first_word else 0
+    subject = " ".join(subject.lower().split()) if subject else None
+
+    pieces = []
+    position = 0
+    wants_help = False
+
+    for match in _matcher().finditer(text):
+        kind = match.lastgroup
+        if kind == "greeting" or kind == "leading_help":
+            if match.start() == opening:
+                if kind == "greeting":
+                    return ParsedPrompt(GREETING, "")
+                wants_help = True
+            # Not at the opening: part of the topic ("how plants grow")
+            continue
+        if kind == "help":
+            wants_help = True
+            continue
+
+        pieces.append(text[position:match.start()])
+        if kind == "marker" and not _introduces_topic(" ".join(pieces), material_type, subject):
+            # Part of the topic: "fractions on a number line", "effects of pollution on rivers"
+            pieces.append(match.group())
+        elif kind == "marker":
+            # "a Mathematics worksheet on fractions" -> "fractions"
+            pieces.clear()
+        position = match.end()
+
+    if wants_help:
+        return ParsedPrompt(HELP, "")
+
+    pieces.append(text[position:])
+    return ParsedPrompt(GENERATE, _clean_topic(" ".join(pieces), material_type))
+
+def _normalize(text):
+    return " ".join(_PUNCTUATION.sub(" ", text).split())
+
+def _introduces_topic(before, material_type, subject):
+    """
+    True when a topic marker follows nothing but request words, or follows a
+    request word directly ("a science experiment about plants").
+    """
+    before = _normalize(before)
+    if subject and subject in before:
+        before = " ".join(f" {before} ".replace(f" {subject} ", " ").split())
+    if not before:
+        return True
+    leading, _, request_end = _edges(material_type)
+    return leading.fullmatch(before) is not None or request_end.search(before) is not None
+
+def _clean_topic(text, material_type):
+    text = _normalize(text)
+    leading, trailing, _ = _edges(material_type)
+    match = leading.match(text)
+    if match:
+        text = text[match.end():]
+    match = trailing.search(text)
+    if match:
+        text = text[:match.start()]
+    return text
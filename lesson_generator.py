@@ -0,0 +1,177 @@
+"""
+CBC lesson material generation, importable without Streamlit.
+
+Holds the curriculum catalogue and the prompt -> template -> material
+pipeline shared by the Streamlit app (chat.py), the command line (cli.py)
+and the HTTP endpoint (server.py). Keep this module free of heavy imports:
+it is on the start-up path of all three.
+"""
+import time
+
+from curriculum import CURRICULUM
+from instrumentation import METRICS
+from intent import GREETING, HELP, parse_prompt
+from material_cache import MATERIAL_CACHE, normalize_topic
+from templates import render, render_sections, split_sections, template_for
+
+# --- 1. CBC CURRICULUM DATA ---
+# Grades and subjects per curriculum level come from the versioned curriculum.json
+GRADES = CURRICULUM.grades
+CBC_SUBJECTS = CURRICULUM.levels
+
+MATERIAL_TYPES = {
+    "worksheet": "📝 Worksheet",
+    "lesson_plan": "📋 Lesson Plan",
+    "activity": "🎯 Learning Activity",
+    "assessment": "✅ Assessment Tool",
+    "flashcards": "🎴 Flashcards",
+    "project": "🔬 Project Guide",
+    "notes": "📖 Study Notes",
+    "quiz": "❓ Quiz/Test"
+}
+
+# Difficulty levels and copies of a differentiated set (differentiate.py)
+LEVELS = {
+    "support": "🟢 Support",
+    "core": "🟡 Core",
+    "extension": "🔴 Extension"
+}
+
+ROLES = {
+    "teacher": "👨‍🏫 Teacher",
+    "student": "👨‍🎓 Student"
+}
+
+def catalogue():
+    """
+    Returns the grades, subjects and material types offered, as plain data.
+    """
+    return {
+        "curriculum_version": CURRICULUM.version,
+        "grades": GRADES,
+        "subjects": CBC_SUBJECTS,
+        "material_types": MATERIAL_TYPES,
+        "levels": LEVELS,
+        "roles": ROLES
+    }
+
+# --- 2. CONTENT GENERATION LOGIC ---
+def resolve_request(prompt, grade, subject, material_type, role):
+    """
+    Works out which template answers `prompt` and with which slot values.
+
+    Returns (template_id, params, cache_key); cache_key is None for
+    greetings and help, which are not worth caching.
+    """
+    with METRICS.timer("intent_parse"):
+        intent, topic = parse_prompt(prompt, material_type, subject)
+
+    # 1. Handle special prompts like greetings or help requests first
+    if intent == GREETING:
+        if role == "teacher":
+            return "greeting_teacher", {"grade": grade, "subject": subject, "material_label": MATERIAL_TYPES[material_type]}, None
+        else:
+            return "greeting_student", {"grade": grade, "subject": subject}, None
+    elif intent == HELP:
+        if role == "teacher":
+            return "help_teacher", {"grade": grade, "subject": subject}, None
+        else:
+            return "help_student", {"grade": grade, "subject": subject}, None
+
+    # 2. Fall back to a generic topic when the prompt names none
+    topic = normalize_topic(topic)
+    if not topic or len(topic) < 3:
+        topic = "the current topic"
+
+    # 3. Generate material based *strictly* on the `material_type` from the sidebar
+    template_id, params = material_params(topic, grade, subject, material_type)
+    return template_id, params, (grade, subject, material_type, role, topic)
+
+def material_params(topic, grade, subject, material_type):
+    """
+    Returns (template_id, params) for `material_type` with an already extracted topic.
+    """
+    template_id = template_for(material_type)
+    if template_id == "unsupported":
+        # Default response if the material_type is unknown or unhandled
+        return template_id, {
+            "grade": grade,
+            "subject": subject,
+            "material_name": MATERIAL_TYPES.get(material_type, material_type),
+            "material_label": MATERIAL_TYPES.get(material_type, "Unknown")
+        }
+
+    return template_id, {"grade": grade, "subject": subject, "topic": topic, "topic_title": topic.title()}
+
+def generate_lesson_material(prompt, grade, subject, material_type, role):
+    """
+    Generates CBC-aligned educational materials based on user input.
+    """
+    return render_resolved(*resolve_request(prompt, grade, subject, material_type, role))
+
+def iter_lesson_material(prompt, grade, subject, material_type, role):
+    """
+    Same as `generate_lesson_material`, but yields the material section by section.
+    """
+    return iter_resolved(*resolve_request(prompt, grade, subject, material_type, role))
+
+def generate_for_topic(topic, grade, subject, material_type, role):
+    """
+    Generates a material for an explicit topic, skipping prompt parsing.
+    """
+    topic = normalize_topic(topic) or "the current topic"
+    template_id, params = material_params(topic, grade, subject, material_type)
+    return render_resolved(template_id, params, (grade, subject, material_type, role, topic))
+
+def render_resolved(template_id, params, cache_key):
+    """
+    Renders a resolved request, reusing any identical material already
+    generated in this process. New materials are saved to the library store.
+    """
+    if cache_key is None:
+        return _timed_render(template_id, params)
+    return MATERIAL_CACHE.get_or_create(cache_key, lambda: _render_and_save(template_id, params))
+
+def iter_resolved(template_id, params, cache_key):
+    """
+    Yields a resolved request section by section, filling the cache at the end.
+    """
+    cached = MATERIAL_CACHE.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        yield from split_sections(cached)
+        return
+
+    sections = []
+    render_seconds = 0.0
+    started = time.perf_counter()
+    for section in render_sections(template_id, **params):
+        render_seconds += time.perf_counter() - started
+        sections.append(section)
+        yield section
+        started = time.perf_counter()
+    # Only the time spent rendering, not the consumer's time between sections
+    METRICS.observe("template_render", render_seconds)
+
+    if cache_key is not None:
+        text = "".join(sections)
+        MATERIAL_CACHE.put(cache_key, text)
+        _save(template_id, params, text)
+
+def _timed_render(template_id, params):
+    with METRICS.timer("template_render"):
+        return render(template_id, **params)
+
+# --- 3. PERSISTENT STORE ---
+# Materials are only written here: re-rendering a template is several times
+# cheaper than reading it back, so the store serves the library, not generation.
+# The write is queued for the store's background thread, so neither a
+# session nor the API server's event loop waits for SQLite or the disk.
+# Imported on first use: SQLite is not needed to start the CLI or the server.
+def _save(template_id, params, text):
+    from store import MATERIAL_STORE
+    MATERIAL_STORE.put_later(template_id, params, text)
+
+def _render_and_save(template_id, params):
+    text = _timed_render(template_id, params)
+    _save(template_id, params, text)
+    return text
@@ -0,0 +1,114 @@
+"""
+Process-wide cache for generated lesson materials.
+
+Streamlit re-executes chat.py on every rerun but imports this module only
+once per process, so `MATERIAL_CACHE` is shared by every session.
+"""
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,;:!?\"'()[]"
+
+# --- 1. TOPIC NORMALIZATION ---
+def normalize_topic(topic):
+    """
+    Normalizes an extracted topic so near-identical prompts share a cache entry.
+    """
+    return _WHITESPACE.sub(" ", topic.lower()).strip(_EDGE_PUNCTUATION)
+
+# --- 2. LRU CACHE ---
+class MaterialCache:
+    """
+    Thread-safe LRU cache bounded by entry count, total bytes and age.
+    """
+
+    def __init__(self, max_entries=2048, max_bytes=64 * 1024 * 1024, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for `key`, or `default` if absent or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry[2] <= time.monotonic():
+                self._discard(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """
+        Stores `value` and evicts least recently used entries over the limits.
+        """
+        size = sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl_seconds)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def get_or_create(self, key, factory):
+        """
+        Returns the cached value for `key`, calling `factory()` on a miss.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """
+        Returns the cache counters as a dict.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _discard(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+# --- 3. SHARED INSTANCE ---
+MATERIAL_CACHE = MaterialCache()
@@ -0,0 +1,43 @@
+"""
+Static page assets for the Streamlit app.
+
+The stylesheet lives in assets/style.css. `page_head` returns it minified,
+together with the header banner, as the HTML for a single markdown
+element; chat.py caches the result with `st.cache_resource`, so the file
+is read and minified once per process rather than on every rerun.
+"""
+import os
+import re
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+BANNER_HTML = (
+    '<div class="header-banner">'
+    "<h1>📚 CBC Lesson Material Generator</h1>"
+    "<p>Create Localized Learning Materials Instantly</p>"
+    "</div>"
+)
+
+_CSS_COMMENTS = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION_SPACE = re.compile(r"\s*([{};,>])\s*")
+# Only after a colon: a space before one is a descendant selector (".a :hover")
+_CSS_COLON_SPACE = re.compile(r":\s+")
+
+def minify_css(css):
+    """
+    Drops comments, redundant whitespace and the last semicolon of each rule.
+    """
+    css = _CSS_COMMENTS.sub("", css)
+    css = _CSS_SPACE.sub(" ", css)
+    css = _CSS_PUNCTUATION_SPACE.sub(r"\1", css)
+    css = _CSS_COLON_SPACE.sub(":", css)
+    return css.replace(";}", "}").strip()
+
+def page_head():
+    """
+    Returns the minified stylesheet and the header banner as one HTML string.
+    """
+    with open(os.path.join(ASSET_DIR, "style.css"), encoding="utf-8") as f:
+        css = minify_css(f.read())
+    return f"<style>{css}</style>{BANNER_HTML}"
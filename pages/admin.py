@@ -0,0 +1,69 @@
+import streamlit as st
+
+from app_state import session_state
+from instrumentation import METRICS, metrics_text
+from material_cache import MATERIAL_CACHE
+from store import MATERIAL_STORE
+
+# --- 1. SET PAGE CONFIGURATION ---
+st.set_page_config(
+    page_title="CBC Generator Admin",
+    page_icon="📈",
+    layout="wide"
+)
+
+st.title("📈 Timings and Profiling")
+st.caption("Per-phase timings are shared by every session in this server process.")
+
+# --- 2. PHASE PERCENTILES ---
+snapshot = METRICS.snapshot()
+if snapshot:
+    st.dataframe(
+        [
+            {
+                "phase": phase,
+                "count": row["count"],
+                "mean ms": row["mean"] * 1000,
+                "p50 ms": row["p50"] * 1000,
+                "p90 ms": row["p90"] * 1000,
+                "p95 ms": row["p95"] * 1000,
+                "p99 ms": row["p99"] * 1000
+            }
+            for phase, row in snapshot.items()
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
+else:
+    st.info("No timings yet. Use the generator page and come back.")
+
+col1, col2 = st.columns(2)
+with col1:
+    st.markdown("### ♻️ Material Cache")
+    st.json(MATERIAL_CACHE.stats())
+with col2:
+    st.markdown("### 📚 Material Store")
+    st.json(MATERIAL_STORE.stats())
+    if MATERIAL_STORE.disabled_reason:
+        st.warning(f"Store disabled: {MATERIAL_STORE.disabled_reason}")
+
+if st.button("🧹 Reset timings"):
+    METRICS.reset()
+    st.rerun()
+
+with st.expander("Prometheus text"):
+    st.code(metrics_text(), language="text")
+
+# --- 3. SESSION PROFILING ---
+st.markdown("### 🔬 Profile My Reruns")
+profiler = session_state(st.session_state).profiler
+
+profiler.enabled = st.toggle(
+    "Capture cProfile and tracemalloc for this session's generator reruns",
+    value=profiler.enabled
+)
+st.caption("Profiling slows every rerun down noticeably; switch it off when done.")
+
+if profiler.last_report:
+    st.metric("Peak traced memory (last rerun)", f"{profiler.last_peak_bytes / 1024:,.1f} KiB")
+    st.code(profiler.last_report, language="text")
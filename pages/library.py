@@ -0,0 +1,84 @@
+import streamlit as st
+from datetime import datetime
+
+from export import EXPORT_FORMATS, FILE_EXTENSIONS, convert, export_zip, slugify
+from lesson_generator import GRADES
+from store import MATERIAL_STORE
+
+PAGE_SIZE = 25
+
+# --- 1. SET PAGE CONFIGURATION ---
+st.set_page_config(
+    page_title="CBC Materials Library",
+    page_icon="📚",
+    layout="wide"
+)
+
+st.title("📚 My Library")
+st.caption("Every material generated on this server, kept across restarts. Opening one reads it back from disk without re-rendering.")
+
+if MATERIAL_STORE.disabled_reason:
+    st.warning(f"The material store is unavailable: {MATERIAL_STORE.disabled_reason}")
+    st.stop()
+
+# --- 2. FILTERS ---
+col1, col2, col3 = st.columns(3)
+with col1:
+    grade = st.selectbox("Grade Level", ["All grades"] + GRADES)
+with col2:
+    subject = st.text_input("Subject", placeholder="e.g. Mathematics")
+with col3:
+    search = st.text_input("Topic contains", placeholder="e.g. fractions")
+
+grade = None if grade == "All grades" else grade
+_, total = MATERIAL_STORE.library(grade, subject.strip(), search.strip(), limit=0)
+if not total:
+    st.info("No materials match yet. Generate some on the main page and they will appear here.")
+    st.stop()
+
+page_count = (total + PAGE_SIZE - 1) // PAGE_SIZE
+page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+entries, total = MATERIAL_STORE.library(grade, subject.strip(), search.strip(), limit=PAGE_SIZE, offset=(page - 1) * PAGE_SIZE)
+
+def entry_label(entry):
+    created = datetime.fromtimestamp(entry.created_at).strftime("%d %b %Y %H:%M")
+    return f"{entry.template_id.replace('_', ' ').title()}: {entry.topic.title()} ({entry.grade} {entry.subject}) · {created}"
+
+st.caption(f"{total} materials")
+
+# --- 3. REOPEN A MATERIAL ---
+entry = st.selectbox("Open material", entries, format_func=entry_label)
+# One copy of the mapped UTF-8 bytes serves the Markdown download; the text
+# is decoded from that copy only for display and the print-ready export
+stored = MATERIAL_STORE.read_bytes(entry.key)
+data = stored.tobytes()
+stored.release()
+text = data.decode("utf-8")
+stem = slugify(f"{entry.template_id} {entry.topic}")
+
+col1, col2 = st.columns(2)
+with col1:
+    st.download_button("💾 Markdown", data, file_name=f"{stem}{FILE_EXTENSIONS['md']}", mime="text/markdown", use_container_width=True)
+with col2:
+    st.download_button(
+        "🖨️ Print-ready HTML",
+        convert(text, "print", title=entry_label(entry)),
+        file_name=f"{stem}{FILE_EXTENSIONS['print']}",
+        mime="text/html",
+        use_container_width=True
+    )
+
+st.markdown("---")
+# Materials from every session are shown here, so topics typed or uploaded by
+# anyone are rendered as plain markdown, never as HTML
+st.markdown(text)
+
+# --- 4. EXPORT THIS PAGE ---
+st.markdown("---")
+formats = st.multiselect("Download formats", list(EXPORT_FORMATS.keys()), default=["md"], format_func=lambda x: EXPORT_FORMATS[x])
+if st.button("🗜️ Export this page as ZIP") and formats:
+    documents = (
+        (f"{number:03d}-{slugify(item.template_id + ' ' + item.topic)}", MATERIAL_STORE.read_text(item.key))
+        for number, item in enumerate(entries, start=(page - 1) * PAGE_SIZE + 1)
+    )
+    st.download_button("💾 Save ZIP", export_zip(documents, formats).read(), file_name="cbc_library.zip", mime="application/zip")
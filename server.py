@@ -0,0 +1,153 @@
+"""
+Minimal asyncio HTTP endpoint for headless material generation.
+
+Serves the same catalogue and generation pipeline as the Streamlit app,
+without Streamlit's per-session rerun overhead:
+
+    GET  /health
+    GET  /metrics    (Prometheus text)
+    GET  /catalogue
+    GET  /topics?grade=...&subject=...&q=...   (sub-strand autocomplete)
+    GET  /generate?prompt=...&grade=...&subject=...&material_type=...&role=...
+    POST /generate   (JSON body with the same fields)
+
+Add `format=html` or `format=print` to get HTML instead of markdown.
+Run with `python cli.py serve` or `python server.py`.
+"""
+import asyncio
+import json
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+from curriculum import CURRICULUM
+from instrumentation import METRICS, metrics_text
+from lesson_generator import MATERIAL_TYPES, catalogue, generate_lesson_material
+
+MAX_BODY_BYTES = 64 * 1024
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+
+class RequestError(Exception):
+    """
+    A client error answered with `status` and a JSON message.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# --- 1. ROUTES ---
+def handle_generate(fields):
+    prompt = fields.get("prompt", "").strip()
+    if not prompt:
+        raise RequestError(400, "'prompt' is required")
+    grade = fields.get("grade", "Grade 4")
+    subject = fields.get("subject", "Mathematics")
+    material_type = fields.get("material_type", "worksheet")
+    if material_type not in MATERIAL_TYPES:
+        raise RequestError(400, f"Unknown material_type '{material_type}'")
+    problems = CURRICULUM.validate(grade, subject, material_type)
+    if problems:
+        raise RequestError(400, "; ".join(problems))
+
+    text = generate_lesson_material(prompt, grade, subject, material_type, fields.get("role", "teacher"))
+    fmt = fields.get("format", "md")
+    if fmt == "md":
+        return 200, "text/markdown; charset=utf-8", text.encode("utf-8")
+    if fmt in ("html", "print"):
+        # Imported on first use to keep server start-up light
+        from export import convert
+        return 200, "text/html; charset=utf-8", convert(text, fmt)
+    raise RequestError(400, f"Unknown format '{fmt}'")
+
+def handle_topics(fields):
+    grade = fields.get("grade", "Grade 4")
+    subject = fields.get("subject", "Mathematics")
+    problems = CURRICULUM.validate(grade, subject)
+    if problems:
+        raise RequestError(400, "; ".join(problems))
+    limit = fields.get("limit", "8")
+    if not limit.isdigit():
+        raise RequestError(400, "'limit' must be a whole number")
+    topics = CURRICULUM.autocomplete(grade, subject, fields.get("q", ""), limit=int(limit))
+    return 200, "application/json", json.dumps({"topics": topics}, ensure_ascii=False).encode("utf-8")
+
+def route(method, target, body):
+    """
+    Returns (status, content type, body bytes) for one request.
+    """
+    url = urlsplit(target)
+    if url.path == "/health":
+        return 200, "application/json", b'{"status": "ok"}'
+    if url.path == "/metrics":
+        return 200, "text/plain; version=0.0.4; charset=utf-8", metrics_text().encode("utf-8")
+    if url.path == "/catalogue":
+        return 200, "application/json", json.dumps(catalogue(), ensure_ascii=False).encode("utf-8")
+    if url.path == "/topics":
+        return handle_topics(dict(parse_qsl(url.query)))
+    if url.path == "/generate":
+        if method == "GET":
+            return handle_generate(dict(parse_qsl(url.query)))
+        if method == "POST":
+            try:
+                fields = json.loads(body or b"{}")
+            except ValueError:
+                raise RequestError(400, "Body must be JSON")
+            if not isinstance(fields, dict):
+                raise RequestError(400, "Body must be a JSON object")
+            return handle_generate({key: str(value) for key, value in fields.items()})
+        raise RequestError(405, f"{method} not allowed")
+    raise RequestError(404, f"No route for {url.path}")
+
+# --- 2. HTTP/1.1 PLUMBING ---
+async def handle_connection(reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0) or 0)
+            started = time.perf_counter()
+            try:
+                if length > MAX_BODY_BYTES:
+                    raise RequestError(413, "Request body too large")
+                body = await reader.readexactly(length) if length else b""
+                status, content_type, payload = route(method.upper(), target, body)
+            except RequestError as error:
+                status, content_type = error.status, "application/json"
+                payload = json.dumps({"error": str(error)}).encode("utf-8")
+            METRICS.observe("api_request", time.perf_counter() - started)
+
+            keep_alive = headers.get("connection", "").lower() != "close" and status != 413
+            writer.write(
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(host="127.0.0.1", port=8600):
+    server = await asyncio.start_server(handle_connection, host, port)
+    print(f"CBC generator API listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    asyncio.run(serve())
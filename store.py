@@ -0,0 +1,361 @@
+"""
+Persistent on-disk store for generated lesson materials.
+
+Materials survive server restarts in two files under `STORE_DIR`:
+
+- `materials.blob`: an append-only file holding every distinct material
+  text once, as UTF-8.
+- `materials.sqlite3`: an index mapping each material key (a hash of the
+  template and its generation parameters) to the hash of its content, and
+  each content hash to an (offset, length) range of the blob file.
+
+Identical outputs are stored once however many parameter sets produce
+them. Reads go through a read-only memory map of the blob file:
+`read_bytes` returns a view of the mapped UTF-8 bytes, so a caller that
+needs bytes (the library page's Markdown download) copies them once
+instead of decoding to text and encoding again.
+
+Generation never waits for the disk. `put_later` queues a material and
+returns; one background thread drains the queue and writes whatever has
+piled up in a single transaction. `flush` waits for the queue to empty and
+also runs at interpreter exit, so the CLI's materials are on disk before
+it returns.
+"""
+import atexit
+import hashlib
+import json
+import mmap
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from instrumentation import METRICS
+from templates import TEMPLATES
+
+STORE_DIR = os.environ.get(
+    "CBC_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
+
+# Queued writes beyond this are dropped (and counted) rather than held in memory
+WRITE_QUEUE_SIZE = 10000
+# Most materials committed in one transaction
+WRITE_BATCH_SIZE = 500
+# Materials remembered as already saved by this process, so re-rendering one
+# after it left the material cache does not queue it again
+RECENT_WRITES = 50000
+
+LibraryEntry = namedtuple("LibraryEntry", "key template_id topic grade subject created_at size")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    content_hash TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS materials (
+    key TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL REFERENCES blobs (content_hash),
+    template_id TEXT NOT NULL,
+    params TEXT NOT NULL,
+    topic TEXT,
+    grade TEXT,
+    subject TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS materials_by_created ON materials (created_at);
+"""
+
+# --- 1. KEYS ---
+_fingerprints = {}
+
+def material_key(template_id, params):
+    """
+    Returns the store key for a template and its slot values.
+
+    The template source is part of the key, so editing a template never
+    serves materials rendered from its old text.
+    """
+    fingerprint = _fingerprints.get(template_id)
+    if fingerprint is None:
+        fingerprint = _fingerprints[template_id] = hashlib.sha1(TEMPLATES[template_id].source.encode("utf-8")).hexdigest()
+    payload = json.dumps([template_id, fingerprint, params], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# --- 2. STORE ---
+class MaterialStore:
+    """
+    Content-addressed material store shared by every session and process.
+
+    Files are opened on first use. If the directory cannot be written,
+    the store disables itself and `disabled_reason` says why; generation
+    carries on without it.
+    """
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+        self.disabled_reason = None
+        self._db = None
+        self._blob = None
+        self._map = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._recent = set()
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.failed_writes = 0
+
+    # --- FILES ---
+    def _open(self):
+        if self._db is not None or self.disabled_reason is not None:
+            return self._db is not None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            db = sqlite3.connect(
+                os.path.join(self.directory, "materials.sqlite3"),
+                isolation_level=None,
+                check_same_thread=False
+            )
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(_SCHEMA)
+            self._blob = open(os.path.join(self.directory, "materials.blob"), "a+b")
+        except (OSError, sqlite3.Error) as error:
+            self.disabled_reason = str(error)
+            return False
+        self._db = db
+        return True
+
+    def _view(self, offset, length):
+        """
+        Returns a zero-copy memoryview of a blob range, remapping if the file grew.
+        """
+        end = offset + length
+        if self._map is None or len(self._map) < end:
+            # Views handed out earlier keep the old map alive until they are released
+            self._map = mmap.mmap(self._blob.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._map)[offset:end]
+
+    # --- READS ---
+    def read_bytes(self, key):
+        """
+        Returns the stored material as a memoryview of UTF-8 bytes, or None.
+        """
+        with self._lock:
+            if not self._open():
+                return None
+            row = self._db.execute(
+                "SELECT b.offset, b.length FROM materials m JOIN blobs b USING (content_hash) WHERE m.key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._view(*row)
+
+    def read_text(self, key):
+        view = self.read_bytes(key)
+        return None if view is None else str(view, "utf-8")
+
+    def get(self, template_id, params):
+        """
+        Returns the stored text for a template and its slot values, or None.
+        """
+        return self.read_text(material_key(template_id, params))
+
+    # --- WRITES ---
+    def put(self, template_id, params, text):
+        """
+        Stores a rendered material unless its key is already stored; returns the key.
+        """
+        key = material_key(template_id, params)
+        with self._lock:
+            if self._open():
+                self._write([(key, template_id, params, text)])
+        return key
+
+    def put_later(self, template_id, params, text):
+        """
+        Queues a rendered material for the background writer and returns at once.
+        """
+        if self.disabled_reason is not None:
+            return
+        identity = (template_id, *sorted(params.items()))
+        if identity in self._recent:
+            return
+        if len(self._recent) >= RECENT_WRITES:
+            self._recent.clear()
+        if self._writer is None:
+            self._start_writer()
+        try:
+            self._queue.put_nowait((template_id, params, text))
+        except queue.Full:
+            self.dropped += 1
+            return
+        self._recent.add(identity)
+
+    def flush(self):
+        """
+        Waits until every queued material has been written.
+        """
+        if self._writer is not None:
+            self._queue.join()
+
+    def _start_writer(self):
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._drain, name="material-store-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _drain(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                # Hashing happens here too, off the generating thread
+                items = [(material_key(template_id, params), template_id, params, text) for template_id, params, text in batch]
+                with METRICS.timer("store_write"), self._lock:
+                    if self._open():
+                        self._write(items)
+            except Exception:
+                # The writer must outlive a bad batch, or flush() would wait forever
+                self.failed_writes += len(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, items):
+        """
+        Writes [(key, template_id, params, text)] in one transaction; the caller holds the lock.
+        """
+        # BEGIN IMMEDIATE takes SQLite's write lock, which also serializes
+        # appends to the blob file between processes sharing the store
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            stored = self._existing("SELECT key FROM materials WHERE key IN ({})", [item[0] for item in items])
+            pending = {}
+            for key, template_id, params, text in items:
+                if key not in stored:
+                    stored.add(key)
+                    data = text.encode("utf-8")
+                    pending[key] = (hashlib.sha256(data).hexdigest(), data, template_id, params)
+
+            known = self._existing("SELECT content_hash FROM blobs WHERE content_hash IN ({})", [row[0] for row in pending.values()])
+            blob_rows = []
+            self._blob.seek(0, os.SEEK_END)
+            offset = self._blob.tell()
+            for content_hash, data, template_id, params in pending.values():
+                if content_hash in known:
+                    self.deduplicated += 1
+                    continue
+                known.add(content_hash)
+                blob_rows.append((content_hash, offset, len(data)))
+                self._blob.write(data)
+                offset += len(data)
+            if blob_rows:
+                # The blob bytes must be in the file before the index points at them
+                self._blob.flush()
+                self._db.executemany("INSERT INTO blobs VALUES (?, ?, ?)", blob_rows)
+
+            now = time.time()
+            self._db.executemany(
+                "INSERT OR IGNORE INTO materials VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        key,
+                        content_hash,
+                        template_id,
+                        json.dumps(params, ensure_ascii=False),
+                        params.get("topic"),
+                        params.get("grade"),
+                        params.get("subject"),
+                        now
+                    )
+                    for key, (content_hash, _, template_id, params) in pending.items()
+                ]
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def _existing(self, query, values):
+        # SQLite allows 999 parameters per statement in older builds
+        found = set()
+        for start in range(0, len(values), 900):
+            chunk = values[start:start + 900]
+            found.update(row[0] for row in self._db.execute(query.format(", ".join("?" * len(chunk))), chunk))
+        return found
+
+    # --- LIBRARY ---
+    def library(self, grade=None, subject=None, search="", limit=50, offset=0):
+        """
+        Returns (entries, total) of stored materials with a topic, newest first.
+        """
+        conditions, args = ["m.topic IS NOT NULL"], []
+        if grade:
+            conditions.append("m.grade = ?")
+            args.append(grade)
+        if subject:
+            conditions.append("m.subject = ?")
+            args.append(subject)
+        if search:
+            conditions.append("m.topic LIKE ?")
+            args.append(f"%{search.lower()}%")
+        where = " AND ".join(conditions)
+
+        with self._lock:
+            if not self._open():
+                return [], 0
+            total = self._db.execute(f"SELECT COUNT(*) FROM materials m WHERE {where}", args).fetchone()[0]
+            rows = self._db.execute(
+                "SELECT m.key, m.template_id, m.topic, m.grade, m.subject, m.created_at, b.length "
+                f"FROM materials m JOIN blobs b USING (content_hash) WHERE {where} "
+                "ORDER BY m.created_at DESC LIMIT ? OFFSET ?",
+                args + [limit, offset]
+            ).fetchall()
+        return [LibraryEntry(*row) for row in rows], total
+
+    def stats(self):
+        materials = blobs = blob_bytes = 0
+        with self._lock:
+            if self._open():
+                materials = self._db.execute("SELECT COUNT(*) FROM materials").fetchone()[0]
+                blobs, blob_bytes = self._db.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM blobs").fetchone()
+        return {
+            "materials": materials,
+            "blobs": blobs,
+            "blob_bytes": blob_bytes,
+            "queued": self._queue.qsize(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "deduplicated": self.deduplicated,
+            "dropped": self.dropped,
+            "failed_writes": self.failed_writes
+        }
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._blob.close()
+                self._db = self._blob = None
+            # Any memoryviews still held keep the map itself alive
+            self._map = None
+
+# Shared by every session in this process
+MATERIAL_STORE = MaterialStore()
@@ -0,0 +1,144 @@
+"""
+Template registry for the CBC Lesson Generator.
+
+Every template is compiled into a plain Python function whose body is a
+single f-string, so rendering a material costs the same as the inline
+f-strings chat.py started with: the slot values are read from `params`
+once and joined by the interpreter's own f-string code. Sources are
+checked at import time and compiled on their first render, which keeps
+the compile out of start-up for templates a process never uses.
+"""
+from keyword import iskeyword
+from string import Formatter
+
+# Markdown horizontal rule separating the sections of a material
+SECTION_BREAK = "\n---\n"
+
+# --- 1. COMPILED TEMPLATE ---
+def _renderer_source(template_id, source):
+    """
+    Returns (slot names, source of a `render(params)` function) for a template.
+    """
+    literal_parts = []
+    slot_names = []
+    for literal, field, spec, conversion in Formatter().parse(source):
+        # Literal braces have to be doubled again inside the f-string
+        literal_parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if spec or conversion or not field.isidentifier() or iskeyword(field) or field == "params":
+            raise ValueError(f"Template '{template_id}' uses an unsupported slot: {{{field}}}")
+        slot_names.append(field)
+        literal_parts.append("{" + field + "}")
+
+    lines = ["def render(params):"]
+    lines.extend(f"    {name} = params[{name!r}]" for name in dict.fromkeys(slot_names))
+    lines.append("    return f" + repr("".join(literal_parts)))
+    return slot_names, "\n".join(lines)
+
+class CompiledTemplate:
+    """
+    A template compiled to an f-string function.
+
+    `render(params)` fills every slot from the `params` dict. After the
+    first call it is the compiled function itself, stored on the instance,
+    so a call has no method-binding or dispatch overhead.
+    """
+    __slots__ = ("template_id", "source", "fields", "sections", "render", "_code")
+
+    def __init__(self, template_id, source, split_sections=True):
+        self.template_id = template_id
+        self.source = source
+        slot_names, self._code = _renderer_source(template_id, source)
+        self.fields = frozenset(slot_names)
+        self.render = self._compile_and_render
+
+        # Each section between horizontal rules is compiled on its own for streaming
+        chunks = source.split(SECTION_BREAK) if split_sections else [source]
+        if len(chunks) == 1:
+            self.sections = (self,)
+        else:
+            last = len(chunks) - 1
+            self.sections = tuple(
+                CompiledTemplate(
+                    f"{template_id}#{i}",
+                    chunk if i == last else chunk + SECTION_BREAK,
+                    split_sections=False
+                )
+                for i, chunk in enumerate(chunks)
+            )
+
+    def _compile_and_render(self, params):
+        namespace = {}
+        exec(compile(self._code, f"<template {self.template_id}>", "exec"), namespace)
+        self.render = namespace["render"]
+        return self.render(params)
+
+    def iter_sections(self, params):
+        """
+        Yields the rendered template one section at a time.
+        """
+        for section in self.sections:
+            yield section.render(params)
+
+# --- 2. TEMPLATE SOURCES ---
+# Slots: {grade}, {subject}, {topic}, {topic_title}, {material_label}, {material_name}
+_TEMPLATE_SOURCES = {
+    "greeting_teacher": """👋 **Welcome, Teacher!**\n\nI'm your CBC Lesson Material Generator. I can help you create:\n\n📝 **Worksheets** - Practice exercises with solutions\n📋 **Lesson Plans** - Structured 40-minute lessons\n🎯 **Activities** - Engaging hands-on learning\n✅ **Assessments** - Quizzes, tests, and rubrics\n📖 **Study Notes** - Summaries and revision materials\n\n**Current Settings:**\n- Grade: {grade}\n- Subject: {subject}\n- Material: {material_label}\n\nWhat would you like me to create today?""",
+    "greeting_student": """👋 **Hello, Student!**\n\nI can help you with:\n\n📖 **Study materials** for {subject}\n📝 **Practice worksheets**\n🎯 **Learning activities**\n💡 **Topic explanations**\n\nWhat topic are you studying in {grade}?""",
+    "help_teacher": """# 💡 How to Use the CBC Lesson Generator\n\nI can create various learning materials for {grade} {subject}:\n\n## **Available Material Types:**\n\n### 📝 **Worksheets**\nPractice exercises with problems to solve. Great for homework or classwork.\n*Example: "Create a math worksheet on fractions for grade 4"*\n\n### 📋 **Lesson Plans**\nComplete 40-minute lesson plans following CBC format.\n*Example: "Write a lesson plan on photosynthesis"*\n\n### 🎯 **Learning Activities**\nHands-on group activities and experiments.\n*Example: "Design a science experiment about plants"*\n\n### ✅ **Assessments**\nTests, quizzes, and evaluation tools with marking schemes.\n*Example: "Generate an end-of-term test for science"*\n\n### 🎴 **Flashcards**\nStudy cards for revision and quick practice.\n*Example: "Make flashcards for Kiswahili vocabulary"*\n\n### 📖 **Study Notes**\nSummaries and revision materials for students.\n*Example: "Create study notes on Kenyan history"*\n\n---\n\n## **Tips for Best Results:**\n\n1. **Be Specific:** Mention the exact topic you want\n   - ✅ "Create worksheet on adding fractions"\n   - ❌ "Create math worksheet"\n\n2. **Mention Grade Level:** (Already set in sidebar)\n   - Current: {grade}\n\n3. **Include Context:** Tell me about your students' needs\n   - "My students struggle with word problems"\n   - "I need visual aids for this topic"\n\n4. **Request Customization:**\n   - "Make it culturally relevant to Kenya"\n   - "Include local examples"\n   - "Add illustrations"\n\n---\n\n## **Sample Requests:**\n\n- "Create a worksheet on multiplication with Kenyan currency examples"\n- "Write a lesson plan about clean water with hands-on activities"\n- "Generate flashcards for English grammar - present tense"\n- "Make an assessment tool for science - states of matter" \n- "Design a group activity about healthy eating using local foods"\n\n---\n\n**What would you like me to create?**\n""",
+    "help_student": """# 💡 How I Can Help You Learn\n\nHi! I can help you study {subject} for {grade}. Here's what I can do:\n\n## **I Can Create:**\n\n📖 **Study Notes** - Summaries to help you understand topics better\n\n📝 **Practice Worksheets** - Problems to practice what you've learned\n\n🎴 **Flashcards** - Cards to help you memorize important facts\n\n💡 **Explanations** - Break down difficult concepts into simple terms\n\n---\n\n## **Just Tell Me:**\n\n1. What topic you're studying\n2. What you need help with\n3. What you find difficult\n\n**Examples:**\n- "I need help understanding fractions"\n- "Can you explain photosynthesis simply?"\n- "Make practice problems for multiplication"\n\n---\n\nWhat subject are you studying today?\n""",
+    "worksheet": """# 📝 **{subject} Worksheet - {grade}**\n**Topic: {topic_title}**\n\n---\n\n## **Part A: Understanding the Concept** (10 marks)\n\n**Instructions:** Answer the following questions in the spaces provided.\n\n1. Define or explain what {topic} means in your own words.\n\n   ____________________________________________________________\n\n   ____________________________________________________________\n\n2. Give TWO real-life examples where you can observe or use {topic}.\n\n   a) ____________________________________________________________\n\n   b) ____________________________________________________________\n\n3. Why is understanding {topic} important? Write one reason.\n\n   ____________________________________________________________\n\n---\n\n## **Part B: Practice Problems** (20 marks)\n\n**Instructions:** Solve the following problems. Show your working.\n\n**Question 1:** [Context-based problem related to {topic}]\n\n_Working space:_\n\n\n\n\n**Question 2:** [Progressive difficulty problem]\n\n_Working space:_\n\n\n\n\n**Question 3:** [Application problem using local context]\n\n_Working space:_\n\n\n\n\n---\n\n## **Part C: Challenge Section** (10 marks)\n\n**Critical Thinking:**\n\n1. How would you explain {topic} to a younger student? Write a simple explanation.\n\n____________________________________________________________\n\n____________________________________________________________\n\n2. Create your own problem about {topic} using things from your environment.\n\n____________________________________________________________\n\n____________________________________________________________\n\n---\n\n## **Teacher's Notes:**\n\n✅ **Learning Outcomes:** Students will be able to:\n- Understand the concept of {topic}\n- Apply knowledge to solve problems\n- Make connections to real-life situations\n\n📊 **Assessment Criteria:**\n- Understanding: 10 marks\n- Problem-solving: 20 marks\n- Critical thinking: 10 marks\n- **Total: 40 marks**\n\n🎯 **Differentiation:**\n- Support struggling learners with Part A\n- Challenge advanced learners with Part C\n- Use group work for collaborative learning\n\n---\n\n*Generated for {grade} - {subject} | CBC Aligned*\n""",
+    "lesson_plan": """📋 **LESSON PLAN**\n**{subject} - {grade}**\n\n---\n\n**Topic:** {topic_title}\n**Date:** ________________\n**Duration:** 40 minutes\n**Class Size:** ______\n\n---\n\n## **1. LEARNING OUTCOMES** 🎯\n\nBy the end of the lesson, learners should be able to:\n- [ ] Explain the concept of {topic}\n- [ ] Apply knowledge to solve related problems\n- [ ] Demonstrate understanding through practical activities\n- [ ] Work collaboratively with peers\n\n**Specific Competencies Addressed:**\n- Communication and collaboration\n- Critical thinking and problem-solving\n- Learning to learn\n\n---\n\n## **2. LEARNING RESOURCES** 📚\n\n**Materials Needed:**\n- Textbooks/reference materials\n- Writing materials (pens, pencils, exercise books)\n- Manila papers/chart papers\n- [Specific materials for {topic}]\n- Locally available resources (e.g., stones, sticks, bottle tops)\n\n**Prerequisite Knowledge:**\nStudents should have prior knowledge of [related foundational concepts]\n\n---\n\n## **3. LESSON STRUCTURE** ⏰\n\n### **Introduction (5 minutes)**\n- Greet learners and settle the class\n- Recap previous lesson briefly\n- Introduce today's topic: {topic}\n- Ask thought-provoking question: "Have you ever wondered about...?"\n- State learning objectives clearly\n\n### **Lesson Development (25 minutes)**\n\n**Activity 1: Teacher Explanation (8 minutes)**\n- Explain the concept of {topic} using simple language\n- Use examples from learners' environment\n- Draw diagrams or illustrations on the board\n- Ask questions to check understanding\n\n**Activity 2: Guided Practice (10 minutes)**\n- Demonstrate a problem/activity related to {topic}\n- Guide learners through solving similar problems\n- Move around the class to assist individuals\n- Encourage peer teaching\n\n**Activity 3: Group Activity (7 minutes)**\n- Divide class into groups of 4-5\n- Give each group a task related to {topic}\n- Provide materials for hands-on activity\n- Monitor group progress and participation\n\n### **Conclusion (10 minutes)**\n- Groups present their findings (2-3 groups)\n- Summarize key points of the lesson\n- Link back to learning objectives\n- Give homework/assignment\n- Preview next lesson\n\n---\n\n## **4. ASSESSMENT METHODS** ✅\n\n**Formative Assessment:**\n- Observation during group work\n- Oral questions throughout the lesson\n- Quick quiz at the end\n\n**Questions to Ask:**\n1. What have we learned about {topic}?\n2. Can someone give an example from our environment?\n3. How can we apply this in our daily lives?\n\n**Homework Assignment:**\n[Related practice exercise or project]\n\n---\n\n## **5. DIFFERENTIATION STRATEGIES** 🎨\n\n**For Struggling Learners:**\n- Provide additional visual aids\n- Pair with peer tutor\n- Give simpler problems\n- Offer more time\n\n**For Advanced Learners:**\n- Assign extension activities\n- Give leadership roles in groups\n- Provide challenging problems\n- Encourage independent research\n\n---\n\n## **6. REFLECTION** 💭\n\n**After the lesson, reflect on:**\n- Were learning outcomes achieved?\n- Which activities worked well?\n- What needs improvement?\n- Did all learners participate?\n- Time management effectiveness\n\n**Notes:**\n_____________________________________________________________\n\n_____________________________________________________________\n\n---\n\n*Prepared for {grade} - {subject} | CBC Aligned*\n*This lesson plan follows the Competency-Based Curriculum framework*\n""",
+    "activity": """🎯 **LEARNING ACTIVITY**\n**{subject} - {grade}**\n\n---\n\n**Activity Title:** Exploring **{topic_title}**\n**Duration:** 30-40 minutes\n**Group Size:** 4-5 learners per group\n\n---\n\n## **LEARNING OBJECTIVES** 🎓\n\nLearners will:\n1. Actively engage with concepts related to {topic}\n2. Collaborate with peers to solve problems\n3. Apply critical thinking skills\n4. Demonstrate understanding through hands-on work\n\n---\n\n## **MATERIALS NEEDED** 📦\n\n- Manila paper or chart paper (1 per group)\n- Markers/crayons/colored pencils\n- Exercise books for recording\n- [Specific items for {topic} - use local materials]\n- Examples: bottle tops, stones, seeds, sticks, newspapers\n\n---\n\n## **ACTIVITY INSTRUCTIONS** 📝\n\n### **Step 1: Introduction (5 minutes)**\n- Teacher explains the activity objectives\n- Demonstrate what students will do\n- Divide class into groups\n- Assign roles: Leader, Recorder, Presenter, Materials Manager\n\n### **Step 2: Main Activity (20-25 minutes)**\n\n**Task for Groups:**\n\nYour group will explore {topic} by:\n\n1. **Discuss** (5 minutes)\n   - What do you know about {topic}?\n   - Share ideas within your group\n   - Write down key points\n\n2. **Create/Experiment** (10-15 minutes)\n   - Use the materials provided\n   - Design a model/chart/experiment about {topic}\n   - Work together - everyone contributes!\n   - Record your observations\n\n3. **Prepare Presentation** (5 minutes)\n   - Organize your findings\n   - Choose who will present\n   - Practice explaining your work\n\n### **Step 3: Presentations (10 minutes)**\n- Each group presents (2-3 minutes per group)\n- Other groups ask questions\n- Teacher provides feedback\n\n---\n\n## **GUIDING QUESTIONS** ❓\n\nHelp your group think about:\n- What did you discover about {topic}?\n- How does this relate to our daily lives?\n- What challenges did you face?\n- What would you do differently?\n- How can you use this knowledge?\n\n---\n\n## **ASSESSMENT CRITERIA** ✅\n\nGroups will be assessed on:\n\n| Criteria | Points |\n|----------|--------|\n| Participation of all members | 5 |\n| Understanding of {topic} | 5 |\n| Creativity and effort | 5 |\n| Presentation quality | 5 |\n| **Total** | **20** |\n\n---\n\n## **EXTENSION ACTIVITIES** 🌟\n\n**For Fast Finishers:**\n- Research more about {topic} using library books\n- Create a poster to display in class\n- Teach the concept to another student\n\n**Home Connection:**\n- Find examples of {topic} at home\n- Discuss with family members\n- Bring an item related to {topic} for next class\n\n---\n\n## **TEACHER NOTES** 📌\n\n**Preparation:**\n- Collect all materials before the lesson\n- Arrange classroom for group work\n- Prepare sample to show students\n\n**During Activity:**\n- Circulate and observe all groups\n- Ask probing questions\n- Assist struggling groups\n- Take photos for documentation\n\n**Safety Considerations:**\n- [List any safety rules relevant to the activity]\n\n**Differentiation:**\n- Provide extra support to groups that need it\n- Give more complex tasks to advanced learners\n- Allow different ways of presenting\n\n---\n\n*Activity designed for {grade} - {subject} | CBC Aligned*\n*Promotes hands-on learning and collaboration*\n""",
+    "assessment": """✅ **ASSESSMENT TOOL**\n**{subject} - {grade}**\n**{topic_title}**\n\n---\n\n**Name:** ______________________________  **Date:** ______________\n\n**Class:** ________  **Time Allowed:** 60 minutes\n\n**Total Marks:** 50\n\n---\n\n## **INSTRUCTIONS** 📋\n\n1. Answer ALL questions in the spaces provided\n2. Write your name and class clearly\n3. Show all your working\n4. Check your answers before submitting\n5. Write neatly and legibly\n\n---\n\n## **SECTION A: Multiple Choice** (10 marks)\n\nChoose the correct answer and write the letter in the brackets.\n\n1. Which of the following best describes {topic}?\n   - A) Option one\n   - B) Option two\n   - C) Option three\n   - D) Option four\n
+   Answer: [ ]\n\n2. [Question about {topic}]\n   - A)\n   - B)\n   - C)\n   - D)\n
+   Answer: [ ]\n\n3-10. [Continue with similar format]\n\n---\n\n## **SECTION B: Short Answer Questions** (15 marks)\n\nAnswer the following questions briefly.\n\n1. Define {topic} in your own words. (3 marks)\n\n   ____________________________________________________________\n\n   ____________________________________________________________\n\n   ____________________________________________________________\n\n2. Give THREE examples of {topic} from your environment. (3 marks)\n\n   a) ____________________________________________________________\n\n   b) ____________________________________________________________\n\n   c) ____________________________________________________________\n\n3. Explain why {topic} is important in our daily lives. (4 marks)\n\n   ____________________________________________________________\n\n   ____________________________________________________________\n\n   ____________________________________________________________\n\n   ____________________________________________________________\n\n4. List TWO ways you can apply knowledge of {topic}. (2 marks)\n\n   a) ____________________________________________________________\n\n   b) ____________________________________________________________\n\n5. What challenges might you face when dealing with {topic}? (3 marks)\n\n   ____________________________________________________________\n\n   ____________________________________________________________\n\n---\n\n## **SECTION C: Problem Solving** (15 marks)\n\nSolve the following problems. Show ALL your working clearly.\n\n**Question 1:** (5 marks)\n\n[Context-based problem related to {topic}]\n\n_Working:_\n\n\n\n\n\n_Answer:_ ______________________\n\n**Question 2:** (5 marks)\n\n[Application problem using real-life scenario]\n\n_Working:_\n\n\n\n\n\n_Answer:_ ______________________\n\n**Question 3:** (5 marks)\n\n[Complex problem requiring critical thinking]\n\n_Working:_\n\n\n\n\n\n_Answer:_ ______________________\n\n---\n\n## **SECTION D: Extended Response** (10 marks)\n\n**Question:** Write a short paragraph explaining {topic}. Include:\n- What it is\n- Why it matters\n- How it's used\n- An example from your life\n\nWrite at least 5-7 sentences.\n\n____________________________________________________________\n\n____________________________________________________________\n\n____________________________________________________________\n\n____________________________________________________________\n\n____________________________________________________________\n\n____________________________________________________________\n\n____________________________________________________________\n\n____________________________________________________________\n\n---\n\n## **MARKING SCHEME** (For Teacher Use)\n\n| Section | Marks | Student Score |\n|---------|-------|---------------|\n| Section A: Multiple Choice | 10 | |\n| Section B: Short Answer | 15 | |\n| Section C: Problem Solving | 15 | |\n| Section D: Extended Response | 10 | |\n| **TOTAL** | **50** | |\n\n**Grading Scale:**\n- 45-50: Exceeds Expectations\n- 35-44: Meets Expectations\n- 25-34: Approaches Expectations\n- Below 25: Needs Support\n\n**Teacher Comments:**\n\n____________________________________________________________\n\n____________________________________________________________\n\n---\n\n*Assessment for {grade} - {subject} | CBC Aligned*\n*Covers knowledge, skills, and competencies*\n""",
+    "flashcards": """🎴 **FLASHCARDS SET**\n**{subject} - {grade}**\n**Topic: {topic_title}**\n\n---\n\n**Instructions for Teachers:**\n1. Print these flashcards on cardstock\n2. Cut along the dotted lines\n3. Fold in half (question on front, answer on back)\n4. Laminate for durability (optional)\n\n**Ways to Use:**\n- Individual study/revision\n- Pair work (students quiz each other)\n- Group games (quiz competitions)\n- Quick formative assessment\n\n---\n\n## 📇 FLASHCARD 1\n**FRONT (Question):**\n> What is {topic}?\n\n**BACK (Answer):**\n> [Clear, concise definition with example]\n\n---\n\n## 📇 FLASHCARD 2\n**FRONT (Question):**\n> Give an example of {topic} from your daily life.\n\n**BACK (Answer):**\n> [Real-world example relevant to Kenyan context]\n\n---\n\n## 📇 FLASHCARD 3\n**FRONT (Question):**\n> Why is {topic} important?\n\n**BACK (Answer):**\n> [2-3 reasons explaining significance]\n\n---\n\n## 📇 FLASHCARD 4\n**FRONT (Question):**\n> How do you [action related to {topic}]?\n\n**BACK (Answer):**\n> [Step-by-step process or method]\n\n---\n\n## 📇 FLASHCARD 5\n**FRONT (Question):**\n> What tools or materials do you need for {topic}?\n\n**BACK (Answer):**\n> [List of relevant materials/tools]\n\n---\n\n## 📇 FLASHCARD 6\n**FRONT (Question):**\n> Name TWO types or categories of {topic}.\n\n**BACK (Answer):**\n> 1. [Type one with brief description]\n> 2. [Type two with brief description]\n\n---\n\n## 📇 FLASHCARD 7\n**FRONT (Question):**\n> What is the difference between [A] and [B] in {topic}?"\n\n**BACK (Answer):**\n> [Clear comparison highlighting key differences]\n\n---\n\n## 📇 FLASHCARD 8\n**FRONT (Question):**\n> Draw or describe [visual element related to {topic}]\n\n**BACK (Answer):**\n> [Description of expected drawing/diagram with labels]\n\n---\n\n## 📇 FLASHCARD 9\n**FRONT (Question):**\n> True or False: [Statement about {topic}]\n\n**BACK (Answer):**\n> [True/False with explanation why]\n\n---\n\n## 📇 FLASHCARD 10\n**FRONT (Question):**\n> Challenge: How can you apply {topic} to solve a problem in your community?\n\n**BACK (Answer):**\n> [Creative application showing higher-order thinking]\n\n---\n\n**BONUS ACTIVITY IDEAS:**\n
+🎯 **Memory Game:** Use two sets of flashcards. Place face down. Students find matching pairs.\n\n🏆 **Quiz Competition:** Divide class into teams. Teams earn points for correct answers.\n\n✏️ **Create Your Own:** Students make their own flashcards about {topic}.\n\n⏱️ **Speed Round:** How many can you answer in 2 minutes?\n\n---\n\n*Flashcards for {grade} - {subject} | CBC Aligned*\n*Print, cut, and laminate for classroom use*\n""",
+    "notes": """📖 **STUDY NOTES**\n**{subject} - {grade}**\n**Topic: {topic_title}**\n\n---\n\n**1. Introduction to {topic_title}**\n\nBrief overview of the topic: What is it? Why is it important?\n\n____________________________________________________________\n____________________________________________________________\n\n**2. Key Definitions & Concepts**\n\n- **[Concept 1]:** [Definition and simple explanation]\n- **[Concept 2]:** [Definition and simple explanation]\n- **[Concept 3]:** [Definition and simple explanation]\n\n**3. Main Ideas & Principles**\n\n- Point 1: [Elaborate on a main idea with examples]\n- Point 2: [Another main idea, perhaps with a diagram or an analogy]\n- Point 3: [Third main idea, how it connects to other concepts]\n\n**4. Examples & Applications**\n\n- **Example 1:** [Real-world example related to {topic}]\n- **Example 2:** [Another example, possibly a local context]\n\n**5. Important Formulas/Diagrams (if applicable)**\n\n[Insert relevant formulas, charts, or diagrams here]\n\n**6. Quick Quiz / Self-Assessment**\n\n1. What is the main idea of {topic}? (Short Answer)\n\n2. Give one example of {topic} that you see every day. (Application)\n\n3. True or False: [Statement related to {topic}] (Concept Check)\n\n**7. Further Reading / Resources**\n\n- [Link to a relevant textbook chapter]\n- [Suggest a video or online article]\n\n---\n\n*Study Notes for {grade} - {subject} | CBC Aligned*\n*Designed for quick revision and understanding*\n""",
+    "unsupported": """I'm sorry, I don't know how to generate '{material_name}' materials yet.\n        Please select one of the available material types from the sidebar.\n\n        **Current Settings:**\n        - Grade: {grade}\n        - Subject: {subject}\n- Material: {material_label}\n\n        What would you like me to create?""",
+}
+
+# --- 3. REGISTRY ---
+TEMPLATES = {
+    template_id: CompiledTemplate(template_id, source)
+    for template_id, source in _TEMPLATE_SOURCES.items()
+}
+
+# Material types that share a template with another type
+MATERIAL_TEMPLATES = {
+    "worksheet": "worksheet",
+    "lesson_plan": "lesson_plan",
+    "activity": "activity",
+    "assessment": "assessment",
+    "quiz": "assessment",
+    "flashcards": "flashcards",
+    "notes": "notes",
+}
+
+def template_for(material_type):
+    """
+    Returns the template id used for a material type, or "unsupported".
+    """
+    return MATERIAL_TEMPLATES.get(material_type, "unsupported")
+
+def render(template_id, **params):
+    """
+    Renders a registered template with the given slot values.
+    """
+    return TEMPLATES[template_id].render(params)
+
+def render_sections(template_id, **params):
+    """
+    Renders a registered template as a generator of sections.
+    """
+    return TEMPLATES[template_id].iter_sections(params)
+
+def split_sections(text):
+    """
+    Splits already rendered text into the same sections `render_sections` yields.
+    """
+    chunks = text.split(SECTION_BREAK)
+    last = len(chunks) - 1
+    return [chunk if i == last else chunk + SECTION_BREAK for i, chunk in enumerate(chunks)]